@@ -5,9 +5,14 @@ import matplotlib.patches as mpatches
 from matplotlib.widgets import Button
 import seaborn as sns
 from datetime import datetime, timedelta
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from derived import ensure
+
 # ============================================================================
 # VIDEO GAMES DATABASE - COMPREHENSIVE ANALYTICS PROJECT
 # ============================================================================
@@ -51,12 +56,7 @@ class VideoGameAnalytics:
         }
         
         df = pd.DataFrame(data)
-        df['Revenue_Million'] = df['Copies_Sold_Million'] * df['Price_USD']
-        df['ROI_Percent'] = ((df['Revenue_Million'] - df['Development_Cost_Million']) 
-                             / df['Development_Cost_Million'] * 100)
-        df['Engagement_Score'] = (df['Rating'] * df['Player_Count'] / 1000000)
-        
-        return df
+        return ensure(df, ['Revenue_Million', 'ROI_Percent', 'Engagement_Score'])
     
     def setup_style(self):
         """Setup matplotlib style"""
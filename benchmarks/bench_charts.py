@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+"""Benchmark every chart at several data scales
+
+Each chart is timed in these stages, on a fresh DatasetStats:
+    aggregate  grouped statistics the chart reads
+    moments    co-moments (means, standard deviations, correlations)
+    density    binned per-group histograms (violins)
+    sketch     KLL quantile sketches (medians, quartiles)
+    build      the chart function drawing into a figure
+    layout     title and tight_layout, as in render.finish_figure
+    encode     PNG encoding of the laid-out figure
+
+Usage:
+    python benchmarks/bench_charts.py --rows 1k,100k --repeat 3
+    python benchmarks/bench_charts.py --save-baseline          # store results as the baseline
+    python benchmarks/bench_charts.py --rows 1M,10M --charts 1,5
+
+Results are written as JSON; when a baseline exists, stages slower than
+baseline by more than --tolerance are reported and the exit status is 1.
+10M rows needs several GB of memory.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from aggregates import DatasetStats
+from charts import CHARTS, ChartGenerator
+from generator import generate_frame
+from render import finish_figure
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCALES = '1k,100k,1M,10M'
+STAGES = ['aggregate', 'moments', 'density', 'sketch', 'build', 'layout', 'encode']
+
+# Differences below this many seconds are never flagged as regressions
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def parse_rows(value):
+    """Parse row counts such as '1k,100k,1M' into integers"""
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    rows = []
+    try:
+        for part in value.lower().split(','):
+            part = part.strip()
+            if part[-1] in multipliers:
+                rows.append(int(float(part[:-1]) * multipliers[part[-1]]))
+            else:
+                rows.append(int(part))
+    except (ValueError, IndexError):
+        raise argparse.ArgumentTypeError(f"invalid row counts: '{value}'")
+    return rows
+
+
+def _aggregates_read_by(df, method_name):
+    """The lazily computed DatasetStats aggregates a chart reads"""
+    stats = DatasetStats(df.copy(deep=False))
+    plt.close(getattr(ChartGenerator(stats.df, stats), method_name)())
+    return {
+        'groups': list(stats.groups),
+        'densities': list(stats.densities),
+        'sketches': list(stats.sketches),
+        'moments': stats._moments is not None,
+    }
+
+
+def _compute_groups(stats, reads):
+    for name in reads['groups']:
+        if name == 'overall':
+            stats.overall
+        else:
+            stats.group(name)
+
+
+def _compute_moments(stats, reads):
+    if reads['moments']:
+        stats.moments
+
+
+def _compute_densities(stats, reads):
+    for name in reads['densities']:
+        stats.density(name)
+
+
+def _compute_sketches(stats, reads):
+    for column in reads['sketches']:
+        stats.sketch(column)
+
+
+# Aggregate stages in the order they run, each with the aggregates it computes
+AGGREGATE_STAGES = [
+    ('aggregate', _compute_groups),
+    ('moments', _compute_moments),
+    ('density', _compute_densities),
+    ('sketch', _compute_sketches),
+]
+
+
+def time_chart(df, chart_number, dpi, reads):
+    """Seconds spent in each stage of drawing one chart
+
+    `reads` (from _aggregates_read_by) lists the aggregates the chart
+    reads, so they are computed in the aggregate stages rather than
+    lazily while the chart is built.
+    """
+    method_name = CHARTS[chart_number - 1][1]
+    timings = {}
+
+    # Shallow copy: derived columns are added to it, not to df
+    stats = DatasetStats(df.copy(deep=False))
+    for stage, compute in AGGREGATE_STAGES:
+        start = time.perf_counter()
+        compute(stats, reads)
+        timings[stage] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fig = getattr(ChartGenerator(stats.df, stats), method_name)()
+    timings['build'] = time.perf_counter() - start
+    try:
+        start = time.perf_counter()
+        finish_figure(fig)
+        timings['layout'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fig.savefig(io.BytesIO(), dpi=dpi, format='png', bbox_inches='tight', facecolor='white')
+        timings['encode'] = time.perf_counter() - start
+    finally:
+        plt.close(fig)
+    return timings
+
+
+def run_benchmarks(scales, charts, repeat=3, dpi=100, seed=42):
+    """Time every chart at every scale; each stage keeps its best of `repeat` runs"""
+    results = []
+    for rows in scales:
+        start = time.perf_counter()
+        df = generate_frame(rows, seed=seed)
+        print(f"\n{rows:,} rows (generated in {time.perf_counter() - start:.1f}s)")
+
+        for chart_number in charts:
+            reads = _aggregates_read_by(df, CHARTS[chart_number - 1][1])
+            runs = [time_chart(df, chart_number, dpi, reads) for _ in range(repeat)]
+            best = {stage: min(run[stage] for run in runs) for stage in STAGES}
+            best['total'] = sum(best.values())
+            results.append({'rows': rows, 'chart': chart_number, 'name': CHARTS[chart_number - 1][0], **best})
+            print(f"  {chart_number:>2}. {CHARTS[chart_number - 1][0]:<40} "
+                  + "  ".join(f"{stage} {best[stage]:7.3f}s" for stage in STAGES))
+        del df
+    return results
+
+
+def environment(repeat, dpi):
+    """Versions and machine details stored with the results"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'dpi': dpi,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Stages slower than the baseline by more than `tolerance` (a fraction)"""
+    previous = {(r['rows'], r['chart']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['rows'], result['chart']))
+        if before is None:
+            continue
+        for stage in STAGES + ['total']:
+            if stage not in before:
+                continue  # baseline recorded before the stage existed
+            old, new = before[stage], result[stage]
+            if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_SECONDS:
+                regressions.append({'rows': result['rows'], 'chart': result['chart'], 'stage': stage,
+                                    'baseline': old, 'current': new})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark chart compute and render stages")
+    parser.add_argument('--rows', type=parse_rows, default=DEFAULT_SCALES,
+                        help=f"comma-separated row counts (default: {DEFAULT_SCALES})")
+    parser.add_argument('--charts', default=None, help="comma-separated chart numbers (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per chart; the fastest is kept")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'))
+    parser.add_argument('--baseline', default=os.path.join(BENCH_DIR, 'baseline.json'))
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.25)")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    charts = [int(n) for n in args.charts.split(',')] if args.charts else list(range(1, len(CHARTS) + 1))
+    results = run_benchmarks(args.rows, charts, args.repeat, args.dpi)
+    report = {'environment': environment(args.repeat, args.dpi), 'results': results}
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to create one)")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if not regressions:
+        print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        return 0
+    print(f"✗ {len(regressions)} regression(s) against {args.baseline}:")
+    for r in regressions:
+        print(f"  {r['rows']:>11,} rows  chart {r['chart']:>2}  {r['stage']:<9} "
+              f"{r['baseline']:.3f}s -> {r['current']:.3f}s")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,140 @@
+import argparse
 import sys
 import os
+import time
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+import instrumentation
 from database import VideoGameDatabase
-from charts import ChartGenerator
+from derived import DERIVED_COLUMNS
+from charts import CHARTS, ChartGenerator
 from interface import InteractiveInterface
+from batch import format_report, parse_figsize, render_all
+from render import OUTPUT_DIR
+from server import DEFAULT_PORT, serve
+from startup import DEFAULT_BUDGET, format_report as format_startup_report, measure_startup
 
-def main():
+def parse_chart_list(value):
+    """Parse a chart selection such as 'all', '3' or '1,4-6' into chart numbers"""
+    if value == 'all':
+        return list(range(1, len(CHARTS) + 1))
+    
+    charts = []
+    try:
+        for part in value.split(','):
+            if '-' in part:
+                first, last = part.split('-', 1)
+                charts.extend(range(int(first), int(last) + 1))
+            else:
+                charts.append(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid chart selection: '{value}'")
+    
+    invalid = [n for n in charts if not 1 <= n <= len(CHARTS)]
+    if invalid or not charts:
+        raise argparse.ArgumentTypeError(f"charts must be between 1 and {len(CHARTS)}: '{value}'")
+    return sorted(set(charts))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Video Game Analytics Dashboard")
+    parser.add_argument('--headless', action='store_true',
+                        help="render charts to files and exit, without prompts or a viewer")
+    parser.add_argument('--charts', type=parse_chart_list, default='all',
+                        help="charts to render in headless mode, e.g. 'all', '3' or '1,4-6'")
+    parser.add_argument('--data-dir', default='data', help="directory holding video_games.csv")
+    parser.add_argument('--output-dir', default=None, help="directory for rendered charts (default: output/)")
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--size', type=parse_figsize, default=None, help="figure size in inches, e.g. 16x10")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="render worker processes in headless and server mode (default: all cores)")
+    parser.add_argument('--no-cache', action='store_true', help="re-render charts even if unchanged")
+    parser.add_argument('--stream', action='store_true',
+                        help="aggregate the CSV chunk by chunk instead of loading it, for files larger than memory; "
+                             "charts draw from the statistics and a bounded sample of rows")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="report import and load time until the menu, then exit")
+    parser.add_argument('--startup-budget', type=float, default=DEFAULT_BUDGET,
+                        help="time-to-menu budget in seconds for --startup-report (exit 1 if exceeded)")
+    parser.add_argument('--profile', action='store_true',
+                        help="report wall/CPU time per chart and pipeline stage on exit (or set ANALYTICS_PROFILE=1)")
+    parser.add_argument('--profile-dir', default=None, help="also write a cProfile .pstats file per chart here")
+    parser.add_argument('--serve', action='store_true',
+                        help="serve the charts over HTTP (PNG/SVG endpoints) instead of the menu")
+    parser.add_argument('--host', default='127.0.0.1', help="address for --serve (0.0.0.0 for the whole network)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port for --serve")
+    return parser.parse_args(argv)
+
+def run_headless(args):
+    """Render the selected charts and return a process exit status"""
+    start = time.perf_counter()
+    try:
+        results = render_all(args.data_dir, charts=args.charts, output_dir=args.output_dir or OUTPUT_DIR,
+                             dpi=args.dpi, fmt=args.format, workers=args.workers,
+                             figsize=args.size, use_cache=not args.no_cache, stream=args.stream)
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    
+    print(format_report(results, time.perf_counter() - start))
+    failed = [r for r in results if r.error]
+    for result in results:
+        if not result.error:
+            print(f"✓ Chart saved: {result.filepath}")
+    if failed:
+        print(f"ERROR: {len(failed)} chart(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+def main(argv=None):
     """Main entry point"""
+    args = parse_args(argv)
+    if args.profile or args.profile_dir:
+        instrumentation.enable(args.profile_dir)
+    try:
+        return run(args)
+    finally:
+        if instrumentation.is_enabled():
+            print("\n" + instrumentation.format_report())
+
+def run(args):
+    """Run the mode selected on the command line and return an exit status"""
+    if args.startup_report:
+        report = measure_startup(args.data_dir)
+        print(format_startup_report(report, args.startup_budget))
+        return 0 if report['total'] <= args.startup_budget else 1
+    if args.headless:
+        return run_headless(args)
+    if args.serve:
+        return serve(args.data_dir, args.host, args.port, args.workers, args.output_dir, args.stream)
+    
     print("\n" + "="*80)
     print("VIDEO GAME ANALYTICS DASHBOARD")
     print("="*80)
     
     # Initialize database
     print("\nInitializing database...")
-    db = VideoGameDatabase('data')
-    df = db.load_database()
+    db = VideoGameDatabase(args.data_dir, mmap=True)
+    if args.stream:
+        # Only the statistics and a bounded sample of rows stay in memory
+        stats = db.stream_database()
+        df = stats.sample
+    else:
+        df = db.load_database()
+        stats = db.load_stats(df)
+    overall = stats.overall
     
     print("\n" + "-"*80)
     print("DATABASE INFORMATION")
     print("-"*80)
-    print(f"Location: {os.path.abspath('data/video_games.csv')}")
-    print(f"Total Games: {len(df)}")
-    print(f"Genres: {df['Genre'].nunique()}")
-    print(f"Platforms: {df['Platform'].nunique()}")
-    print(f"Publishers: {df['Publisher'].nunique()}")
-    print(f"Data Columns: {len(df.columns)}")
+    print(f"Location: {os.path.abspath(db.csv_path)}")
+    print(f"Total Games: {stats.rows}")
+    print(f"Genres: {len(stats.genre.size)}")
+    print(f"Platforms: {len(stats.platform.size)}")
+    print(f"Publishers: {len(stats.publisher.size)}")
+    print(f"Data Columns: {len([col for col in df.columns if col not in DERIVED_COLUMNS])}")
     
     print(f"\nDatabase Preview (First 3 Games):")
     print("-"*80)
@@ -36,23 +143,25 @@ def main():
     
     print(f"\nKey Statistics:")
     print("-"*80)
-    print(f"Total Revenue: ${df['Revenue_Million'].sum():,.2f}M")
-    print(f"Average Price: ${df['Price_USD'].mean():.2f}")
-    print(f"Average Rating: {df['Rating'].mean():.2f}/10")
-    print(f"Total Players: {df['Player_Count'].sum():,.0f}")
-    print(f"Average ROI: {df['ROI_Percent'].mean():.2f}%")
+    print(f"Total Revenue: ${overall.loc['sum', 'Revenue_Million']:,.2f}M")
+    print(f"Average Price: ${overall.loc['mean', 'Price_USD']:.2f}")
+    print(f"Average Rating: {overall.loc['mean', 'Rating']:.2f}/10")
+    print(f"Total Players: {overall.loc['sum', 'Player_Count']:,.0f}")
+    print(f"Average ROI: {overall.loc['mean', 'ROI_Percent']:.2f}%")
     
     print("\n" + "="*80)
     print("INITIALIZING INTERACTIVE INTERFACE")
     print("="*80)
     
-    chart_gen = ChartGenerator(df)
-    interface = InteractiveInterface(chart_gen, total_charts=10)
+    chart_gen = ChartGenerator(df, stats=stats)
+    # Streamed statistics are sent to the pre-render workers, which would otherwise load the data
+    interface = InteractiveInterface(chart_gen, total_charts=10, data_source=None if args.stream else args.data_dir)
     
     print("\nStarting menu system...")
     print("You can select any chart from 1-10, view it, and return to menu.\n")
     
     interface.run()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,378 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from density import GroupedHistogram
+from derived import ensure
+from instrumentation import stage
+from moments import CoMoments
+from schema import NUMERIC_COLUMNS
+from sketch import GroupedSketch
+
+
+def _plain_index(index):
+    """Replace categorical index levels with plain values so chunks align"""
+    if isinstance(index, pd.MultiIndex):
+        levels = [_plain_index(index.get_level_values(i)) for i in range(index.nlevels)]
+        return pd.MultiIndex.from_arrays(levels, names=index.names)
+    if isinstance(index, pd.CategoricalIndex):
+        return pd.Index(np.asarray(index), name=index.name)
+    return index
+
+
+class GroupedStats:
+    """Mergeable per-group count, mean, M2, min and max of numeric columns
+
+    Means and sums of squared deviations (M2) are combined with Chan's
+    parallel update, so statistics built from chunks or worker partitions
+    match a single pass over the whole frame.
+    """
+
+    def __init__(self, by, columns):
+        self.by = by
+        keys = [by] if isinstance(by, str) else list(by)
+        self.columns = [col for col in columns if col not in keys]
+        self.size = pd.Series(dtype='int64')
+        self.count = pd.DataFrame(columns=self.columns, dtype='int64')
+        self.mean = pd.DataFrame(columns=self.columns, dtype='float64')
+        self.m2 = pd.DataFrame(columns=self.columns, dtype='float64')
+        self.min = pd.DataFrame(columns=self.columns, dtype='float64')
+        self.max = pd.DataFrame(columns=self.columns, dtype='float64')
+
+    @classmethod
+    def from_frame(cls, df, by, columns=NUMERIC_COLUMNS):
+        """Compute grouped statistics of df in one groupby"""
+        ensure(df, columns)
+        stats = cls(by, [col for col in columns if col in df.columns])
+        stats._fill(df)
+        return stats
+
+    def _fill(self, df):
+        grouped = df.groupby(self.by, observed=True)
+        values = grouped[self.columns]
+        agg = values.agg(['count', 'mean', 'var', 'min', 'max'])
+        agg.index = _plain_index(agg.index)
+
+        self.size = grouped.size()
+        self.size.index = agg.index
+        self.count = agg.xs('count', axis=1, level=1)
+        self.mean = agg.xs('mean', axis=1, level=1).astype('float64')
+        self.m2 = (agg.xs('var', axis=1, level=1) * (self.count - 1)).fillna(0.0)
+        self.min = agg.xs('min', axis=1, level=1).astype('float64')
+        self.max = agg.xs('max', axis=1, level=1).astype('float64')
+
+    def update(self, df):
+        """Fold a chunk of rows into the statistics"""
+        ensure(df, self.columns)
+        part = GroupedStats(self.by, self.columns)
+        part._fill(df)
+        self.merge(part)
+
+    def merge(self, other):
+        """Combine another GroupedStats over disjoint rows into this one"""
+        if self.size.empty:
+            self.size, self.count, self.mean = other.size, other.count, other.mean
+            self.m2, self.min, self.max = other.m2, other.min, other.max
+            return self
+
+        index = self.size.index.union(other.size.index)
+        n_a = self.count.reindex(index, fill_value=0)
+        n_b = other.count.reindex(index, fill_value=0)
+        mean_a = self.mean.reindex(index, fill_value=0.0)
+        mean_b = other.mean.reindex(index, fill_value=0.0)
+        n = n_a + n_b
+
+        delta = mean_b - mean_a
+        safe_n = n.where(n > 0, 1)
+        self.mean = mean_a + delta * n_b / safe_n
+        self.m2 = (self.m2.reindex(index, fill_value=0.0) + other.m2.reindex(index, fill_value=0.0)
+                   + delta ** 2 * n_a * n_b / safe_n)
+        self.count = n
+        self.size = self.size.reindex(index, fill_value=0) + other.size.reindex(index, fill_value=0)
+        self.min = np.fmin(self.min.reindex(index), other.min.reindex(index))
+        self.max = np.fmax(self.max.reindex(index), other.max.reindex(index))
+        return self
+
+    @property
+    def sum(self):
+        return self.mean.where(self.count > 0, 0.0) * self.count
+
+    @property
+    def sumsq(self):
+        """Sum of squared values per group, from the mean and M2"""
+        return (self.m2 + self.count * self.mean ** 2).where(self.count > 0, 0.0)
+
+    @property
+    def var(self):
+        return self.m2 / (self.count - 1).where(self.count > 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    def subset(self, mask):
+        """GroupedStats of the groups selected by a boolean mask over the groups"""
+        out = GroupedStats(self.by, self.columns)
+        for name in ('size', 'count', 'mean', 'm2', 'min', 'max'):
+            setattr(out, name, getattr(self, name)[mask])
+        return out
+
+    def rollup(self, by):
+        """Combine groups into a coarser grouping over a subset of the keys"""
+        keys = [by] if isinstance(by, str) else list(by)
+        sums = self.sum
+        group_mean = sums.groupby(level=keys).transform('sum') / self.count.groupby(level=keys).transform('sum')
+        spread = self.m2 + self.count * (self.mean - group_mean) ** 2
+        
+        out = GroupedStats(by, self.columns)
+        out.size = self.size.groupby(level=keys).sum()
+        out.count = self.count.groupby(level=keys).sum()
+        out.mean = sums.groupby(level=keys).sum() / out.count.where(out.count > 0)
+        out.m2 = spread.fillna(0.0).groupby(level=keys).sum()
+        out.min = self.min.groupby(level=keys).min()
+        out.max = self.max.groupby(level=keys).max()
+        return out
+
+    def total(self):
+        """Collapse all groups into overall count/sum/mean/std/min/max per column"""
+        count = self.count.sum()
+        mean = self.sum.sum() / count
+        m2 = self.m2.sum() + (self.count * (self.mean - mean) ** 2).sum()
+        return pd.DataFrame({
+            'count': count,
+            'sum': self.sum.sum(),
+            'mean': mean,
+            'std': np.sqrt(m2 / (count - 1).where(count > 1)),
+            'min': self.min.min(),
+            'max': self.max.max(),
+        }).T
+
+
+class DatasetStats:
+    """Grouped statistics for every dimension the charts aggregate over
+
+    The frame (or stream of chunks) is scanned once at the base grain of
+    all chart dimensions; each dimension is then a cheap rollup of those
+    base groups, so every chart reads from the same single pass. For
+    streams, `sample` holds a bounded uniform sample of rows for the
+    charts that draw full distributions. Binned per-group histograms of
+    the DENSITIES columns are kept alongside for density charts, and
+    one-pass co-moments of the correlated columns for means, standard
+    deviations and correlations. Quantile sketches of the SKETCHES
+    columns give medians and percentiles without sorting the rows.
+
+    The base statistics form a cube over Genre x Platform x Publisher x
+    Release_Year: count, sum and sum of squares (kept as mean and M2)
+    plus min and max of every numeric column per cell. Its size depends
+    on the cardinalities, not the row count, and it is persisted with
+    save(). Filtered statistics (select()) are rolled up from the
+    matching cells.
+
+    Derived columns (Revenue_Million, ROI_Percent, ...) are added to the
+    rows by derived.ensure() the first time a scan needs them.
+    """
+
+    FORMAT_VERSION = 4
+    BASE_GRAIN = ['Genre', 'Platform', 'Publisher', 'Release_Year']
+    DIMENSIONS = {
+        'genre': 'Genre',
+        'platform': 'Platform',
+        'publisher': 'Publisher',
+        'year_genre': ['Release_Year', 'Genre'],
+    }
+    # name -> (grouping column, binned column)
+    DENSITIES = {
+        'playtime': ('Genre', 'Playtime_Hours'),
+    }
+    # sketched column -> grouping column for per-group quantiles (or None)
+    SKETCHES = {
+        'Rating': None,
+        'Playtime_Hours': 'Genre',
+    }
+
+    def __init__(self, df=None, columns=NUMERIC_COLUMNS):
+        self.df = df
+        self.columns = columns
+        self.groups = {}
+        self.densities = {}
+        self._moments = None
+        self.sketches = {}
+        self.base = None
+        self.rows = 0 if df is None else len(df)
+        self.sample = df
+        self.fingerprint = None
+
+    def _base(self):
+        if self.base is None:
+            if self.df is None:
+                raise KeyError("No data to compute statistics from")
+            with stage('aggregate'):
+                self.base = GroupedStats.from_frame(self.df, self.BASE_GRAIN, self.columns)
+        return self.base
+
+    @property
+    def cube(self):
+        """Base-grain statistics every dimension is rolled up from"""
+        return self._base()
+
+    def select(self, filters, df=None):
+        """Statistics of the games matching a FilterSpec, without rescanning rows
+
+        Grouped dimensions roll up the matching cube cells. `df` holds the
+        matching rows (or a sample of them), from which the sample-based
+        charts, moments, sketches and histograms are computed on first use.
+        """
+        cube = self.cube
+        mask = np.ones(len(cube.size), dtype=bool)
+        for column, clause in filters.clauses().items():
+            if clause is None:
+                continue
+            keys = cube.size.index.get_level_values(column)
+            if isinstance(clause, (set, frozenset)):
+                mask &= keys.isin(list(clause))
+            else:
+                mask &= (keys >= clause[0]) & (keys <= clause[1])
+
+        stats = DatasetStats(df, self.columns)
+        stats.base = cube.subset(mask)
+        stats.rows = int(stats.base.size.sum())
+        return stats
+
+    def group(self, name):
+        """Grouped statistics for a named dimension"""
+        if name not in self.groups:
+            base = self._base()
+            with stage('aggregate'):
+                self.groups[name] = base.rollup(self.DIMENSIONS[name])
+        return self.groups[name]
+
+    def density(self, name):
+        """Per-group histograms for a named entry of DENSITIES"""
+        if name not in self.densities:
+            if self.df is None:
+                raise KeyError("No data to compute statistics from")
+            by, column = self.DENSITIES[name]
+            with stage('aggregate'):
+                self.densities[name] = GroupedHistogram.from_frame(self.df, by, column)
+        return self.densities[name]
+
+    def sketch(self, column):
+        """Quantile sketches of a SKETCHES column, overall and per group"""
+        if column not in self.sketches:
+            if self.df is None:
+                raise KeyError("No data to compute statistics from")
+            with stage('aggregate'):
+                self.sketches[column] = GroupedSketch.from_frame(self.df, column, self.SKETCHES[column])
+        return self.sketches[column]
+
+    @property
+    def moments(self):
+        """Count, means and co-moments of the correlated numeric columns"""
+        if self._moments is None:
+            if self.df is None:
+                raise KeyError("No data to compute statistics from")
+            with stage('aggregate'):
+                self._moments = CoMoments.from_frame(self.df)
+        return self._moments
+
+    def update(self, chunk):
+        """Fold a chunk of rows into the base statistics"""
+        ensure(chunk, self.columns)
+        if self.base is None:
+            self.base = GroupedStats(self.BASE_GRAIN, [col for col in self.columns if col in chunk.columns])
+        self.base.update(chunk)
+        for name, (by, column) in self.DENSITIES.items():
+            if column in chunk.columns:
+                self.densities.setdefault(name, GroupedHistogram(by, column)).update(chunk)
+        if self._moments is None:
+            self._moments = CoMoments()
+        self._moments.update(chunk)
+        for column, by in self.SKETCHES.items():
+            self.sketches.setdefault(column, GroupedSketch(column, by)).update(chunk)
+        self.groups.clear()
+        self.rows += len(chunk)
+
+    def save(self, path):
+        """Persist the base statistics and histograms (not the rows) to a file"""
+        self._base()
+        for name in self.DENSITIES:
+            self.density(name)
+        self.moments
+        for column in self.SKETCHES:
+            self.sketch(column)
+        state = {
+            'version': self.FORMAT_VERSION,
+            'fingerprint': self.fingerprint,
+            'columns': self.columns,
+            'rows': self.rows,
+            'base': self.base,
+            'densities': self.densities,
+            'moments': self._moments,
+            'sketches': self.sketches,
+        }
+        # Per-process temporary file: worker processes may save concurrently
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, fingerprint=None, df=None):
+        """Load statistics saved by save(), or None if missing or for other data
+
+        `df`, if given, is attached as the rows for sample-based charts.
+        """
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if state.get('version') != cls.FORMAT_VERSION:
+            return None
+        if fingerprint is not None and state['fingerprint'] != fingerprint:
+            return None
+
+        stats = cls(df, state['columns'])
+        stats.rows = state['rows']
+        stats.base = state['base']
+        stats.densities = state['densities']
+        stats._moments = state['moments']
+        stats.sketches = state['sketches']
+        stats.fingerprint = state['fingerprint']
+        return stats
+
+    @property
+    def genre(self):
+        return self.group('genre')
+
+    @property
+    def platform(self):
+        return self.group('platform')
+
+    @property
+    def publisher(self):
+        return self.group('publisher')
+
+    @property
+    def year_genre(self):
+        return self.group('year_genre')
+
+    @property
+    def playtime(self):
+        return self.density('playtime')
+
+    @property
+    def sample_fraction(self):
+        """Share of all rows present in `sample`"""
+        if self.sample is None or self.rows == 0:
+            return 0.0
+        return len(self.sample) / self.rows
+
+    @property
+    def overall(self):
+        """Overall count/sum/mean/std/min/max per numeric column"""
+        if 'overall' not in self.groups:
+            self.groups['overall'] = self.genre.total()
+        return self.groups['overall']
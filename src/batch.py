@@ -0,0 +1,200 @@
+"""Render every chart in parallel across CPU cores
+
+Usage:
+    python src/batch.py --data-dir data --output-dir output --workers 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import instrumentation
+from charts import CHARTS, ChartGenerator
+from database import VideoGameDatabase
+from render import OUTPUT_DIR, cached_chart, render_chart
+
+# `stages` holds instrumentation records from a worker process, if enabled
+RenderResult = namedtuple('RenderResult', ['chart_number', 'filepath', 'seconds', 'error', 'cached', 'stages'],
+                          defaults=(None,))
+
+# Chart generator of the current worker process, set by init_worker
+_worker_generator = None
+
+
+def load_generator(source, stream=False):
+    """Build a ChartGenerator from a data directory, a DataFrame or a ChartGenerator
+
+    With `stream`, a data directory's CSV is aggregated chunk by chunk
+    and the charts draw from those statistics and a bounded row sample.
+    """
+    if isinstance(source, ChartGenerator):
+        return source
+    if isinstance(source, str):
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = VideoGameDatabase(source, mmap=True)  # workers only read the data
+            if stream:
+                stats = db.stream_database()
+                return ChartGenerator(stats.sample, stats=stats)
+            df = db.load_database()
+            return ChartGenerator(df, stats=db.load_stats(df))
+    return ChartGenerator(source)
+
+
+def prepare_source(source, stats=False, stream=False):
+    """Generate the dataset and its columnar cache (and with `stats`, the persisted statistics) if needed
+
+    Runs in the parent before a worker pool starts, so workers only read
+    these files instead of all writing them at once. With `stream` only
+    a missing CSV is generated; the data is never loaded whole.
+    """
+    if not isinstance(source, str):
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = VideoGameDatabase(source)
+        if stream:
+            if not os.path.exists(db.csv_path):
+                db.generate_database()
+        elif stats:
+            db.load_stats(db.load_database())
+        elif not db.column_store.is_fresh():
+            db.load_database()
+
+
+def init_worker(source):
+    """Process pool initializer: load the dataset once per worker"""
+    global _worker_generator
+    instrumentation.reset()  # drop records inherited from a forked parent
+    _worker_generator = load_generator(source)
+
+
+def _timed_render(generator, chart_number, output_dir, dpi, fmt, figsize):
+    start = time.perf_counter()
+    try:
+        filepath = render_chart(generator, chart_number, output_dir, dpi, fmt, figsize)
+        error = None
+    except Exception as e:
+        filepath, error = None, str(e)
+    return RenderResult(chart_number, filepath, time.perf_counter() - start, error, False)
+
+
+def render_in_worker(chart_number, output_dir, dpi, fmt, figsize):
+    """Render one chart with the worker's ChartGenerator"""
+    result = _timed_render(_worker_generator, chart_number, output_dir, dpi, fmt, figsize)
+    if instrumentation.is_enabled():
+        result = result._replace(stages=instrumentation.snapshot())
+        instrumentation.reset()
+    return result
+
+
+def _source_fingerprint(source, stream=False):
+    if isinstance(source, str):
+        db = VideoGameDatabase(source)
+        return db.stream_fingerprint() if stream else db.fingerprint()
+    return load_generator(source).fingerprint
+
+
+def render_all(source, charts=None, output_dir=OUTPUT_DIR, dpi=300, fmt='png', workers=None,
+               figsize=None, use_cache=True, stream=False):
+    """Render charts (numbered from 1, default all) into output_dir
+    
+    `source` is a data directory, a DataFrame or a ChartGenerator; each
+    worker process loads it once. Charts already rendered from the same
+    data with the same parameters are served from output_dir unless
+    use_cache is False. With `stream`, a data directory's CSV is streamed
+    once here instead of loaded (for files larger than memory) and the
+    workers get its statistics and sample. Returns RenderResults in chart
+    order; with workers=1 everything runs in the current process.
+    """
+    charts = list(charts or range(1, len(CHARTS) + 1))
+    results = []
+    prepare_source(source, stream=stream)
+    
+    if use_cache:
+        fingerprint = _source_fingerprint(source, stream)
+        missing = []
+        for chart_number in charts:
+            filepath = cached_chart(fingerprint, chart_number, output_dir, dpi, fmt, figsize)
+            if filepath:
+                results.append(RenderResult(chart_number, filepath, 0.0, None, True))
+            else:
+                missing.append(chart_number)
+        charts = missing
+    if not charts:
+        return sorted(results, key=lambda r: r.chart_number)
+    
+    if stream:
+        source = load_generator(source, stream=True)
+    
+    if workers == 1:
+        generator = load_generator(source)
+        results.extend(_timed_render(generator, n, output_dir, dpi, fmt, figsize) for n in charts)
+    else:
+        workers = min(workers or os.cpu_count() or 1, len(charts))
+        prepare_source(source, stats=True)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(source,)) as executor:
+            futures = [executor.submit(render_in_worker, n, output_dir, dpi, fmt, figsize) for n in charts]
+            for future in as_completed(futures):
+                result = future.result()
+                instrumentation.merge(result.stages)
+                results.append(result)
+    return sorted(results, key=lambda r: r.chart_number)
+
+
+def format_report(results, wall_time):
+    """Per-chart render times as a printable table"""
+    lines = [f"{'Chart':<45} {'Time':>8}", "-" * 54]
+    for result in results:
+        name = f"{result.chart_number}. {CHARTS[result.chart_number - 1][0]}"
+        if result.error:
+            status = f"  ERROR: {result.error}"
+        else:
+            status = "  (cached)" if result.cached else ""
+        lines.append(f"{name:<45} {result.seconds:>7.2f}s{status}")
+    lines.append("-" * 54)
+    lines.append(f"{'Sum of chart times':<45} {sum(r.seconds for r in results):>7.2f}s")
+    lines.append(f"{'Wall time':<45} {wall_time:>7.2f}s")
+    return "\n".join(lines)
+
+
+def parse_figsize(value):
+    """Parse a figure size such as '16x10' into (width, height) inches"""
+    try:
+        width, height = (float(v) for v in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: '{value}' (expected WIDTHxHEIGHT)")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render all dashboard charts in parallel")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--size', type=parse_figsize, default=None, help="figure size in inches, e.g. 16x10")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--no-cache', action='store_true', help="re-render charts even if unchanged")
+    parser.add_argument('--stream', action='store_true',
+                        help="aggregate the CSV chunk by chunk instead of loading it (files larger than memory)")
+    parser.add_argument('--profile', action='store_true', help="report wall/CPU time per chart and stage")
+    parser.add_argument('--profile-dir', default=None, help="also write a cProfile .pstats file per chart here")
+    args = parser.parse_args(argv)
+    if args.profile or args.profile_dir:
+        instrumentation.enable(args.profile_dir)
+    
+    start = time.perf_counter()
+    results = render_all(args.data_dir, output_dir=args.output_dir, dpi=args.dpi, fmt=args.format,
+                         workers=args.workers, figsize=args.size, use_cache=not args.no_cache,
+                         stream=args.stream)
+    print(format_report(results, time.perf_counter() - start))
+    if instrumentation.is_enabled():
+        print("\n" + instrumentation.format_report())
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
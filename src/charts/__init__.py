@@ -1,69 +1,166 @@
-"""Charts package - Import all individual chart functions"""
+"""Charts package - Chart modules are imported on first use
 
-from .chart_1 import chart_1_sales_by_genre_bar
-from .chart_2 import chart_2_sales_trend_line
-from .chart_3 import chart_3_market_share_pie
-from .chart_4 import chart_4_price_vs_rating_scatter
-from .chart_5 import chart_5_rating_distribution_histogram
-from .chart_6 import chart_6_correlation_heatmap
-from .chart_7 import chart_7_roi_by_publisher_box
-from .chart_8 import chart_8_playtime_by_genre_violin
-from .chart_9 import chart_9_stacked_revenue_area
-from .chart_10 import chart_10_player_count_power_bubble
+Importing the package is cheap: matplotlib, seaborn and the individual
+chart modules are only loaded when a chart function is first requested.
+"""
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import importlib
+
+from aggregates import DatasetStats
+from column_store import frame_fingerprint
+
+# Menu title and ChartGenerator method for every chart, in display order
+CHARTS = [
+    ('Sales by Genre (Bar Chart)', 'chart_1_sales_by_genre_bar'),
+    ('Sales Trend Over Years (Line Chart)', 'chart_2_sales_trend_line'),
+    ('Market Share by Platform (Pie Chart)', 'chart_3_market_share_pie'),
+    ('Price vs Rating (Scatter Plot)', 'chart_4_price_vs_rating_scatter'),
+    ('Rating Distribution (Histogram)', 'chart_5_rating_distribution_histogram'),
+    ('Correlation Matrix (Heatmap)', 'chart_6_correlation_heatmap'),
+    ('ROI by Publisher (Box Plot)', 'chart_7_roi_by_publisher_box'),
+    ('Playtime by Genre (Violin Plot)', 'chart_8_playtime_by_genre_violin'),
+    ('Revenue Over Years (Area Chart)', 'chart_9_stacked_revenue_area'),
+    ('Player Count vs Sales (Bubble Chart)', 'chart_10_player_count_power_bubble'),
+]
+
+# Chart function name -> module that defines it
+CHART_MODULES = {method_name: f".chart_{i}" for i, (_, method_name) in enumerate(CHARTS, 1)}
+
+
+# matplotlib style is process-wide, so it is applied once per process
+_style_applied = False
+
+
+def load_chart(name):
+    """Import the module defining a chart function and return the function"""
+    function = getattr(importlib.import_module(CHART_MODULES[name], __name__), name)
+    globals()[name] = function
+    return function
+
+
+def __getattr__(name):
+    """Load chart functions on first access (PEP 562)"""
+    if name in CHART_MODULES:
+        return load_chart(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class ChartGenerator:
     """Generate all 10 professional charts"""
     
-    def __init__(self, df):
-        self.df = df
-        self.setup_style()
+    def __init__(self, df, stats=None, refresh=False, filters=None):
+        # In refresh mode every chart keeps its figure and updates its artists in place
+        self.refresh_mode = refresh
+        self._figures = {}
+        self.filters = filters
+        self.update_data(df, stats)
+    
+    def update_data(self, df, stats=None):
+        """Switch to new data, keeping the filters; kept figures are refreshed when next drawn"""
+        self.source_df = df
+        # One shared set of grouped statistics, computed on first use
+        self.source_stats = stats or DatasetStats(df)
+        self.set_filters(self.filters)
+    
+    def set_filters(self, filters=None):
+        """Restrict every chart to the games matching a FilterSpec (None for all games)"""
+        if filters:
+            df = filters.apply(self.source_df)
+            if df.empty:
+                raise ValueError(f"No games match {filters!r}")
+            # Grouped statistics roll up the matching cells of the unfiltered cube
+            self.df, self.stats = df, self.source_stats.select(filters, df)
+        else:
+            self.df, self.stats = self.source_df, self.source_stats
+        self.filters = filters
+        self._fingerprint = None
+    
+    def close(self):
+        """Close the figures kept in refresh mode"""
+        if self._figures:
+            import matplotlib.pyplot as plt
+            for fig, _ in self._figures.values():
+                plt.close(fig)
+            self._figures.clear()
+    
+    @property
+    def fingerprint(self):
+        """Identity of the dataset behind the charts, used to key rendered files"""
+        if self._fingerprint is None:
+            self._fingerprint = self.stats.fingerprint or frame_fingerprint(self.df)
+        return self._fingerprint
     
     def setup_style(self):
         """Setup matplotlib style"""
+        global _style_applied
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         plt.style.use('seaborn-v0_8-darkgrid')
         sns.set_palette("husl")
         plt.rcParams['figure.facecolor'] = '#FFFFFF'
         plt.rcParams['axes.facecolor'] = '#F8F9FA'
         plt.rcParams['font.size'] = 10
         plt.rcParams['font.family'] = 'sans-serif'
+        _style_applied = True
+    
+    def _draw(self, name):
+        """Apply the style on first use, then build the named chart"""
+        if not _style_applied:
+            self.setup_style()
+        if name in self._figures:
+            fig, drawn = self._figures[name]
+            if drawn is self.stats or fig.refresh(self.stats):
+                self._figures[name] = (fig, self.stats)
+                return fig
+            # The skeleton no longer fits (e.g. a new genre): rebuild it
+            import matplotlib.pyplot as plt
+            plt.close(fig)
+            del self._figures[name]
+        fig = load_chart(name)(self.df, self.stats)
+        if self.refresh_mode:
+            self._figures[name] = (fig, self.stats)
+        return fig
+    
+    def keeps(self, fig):
+        """Whether a figure is kept for in-place refreshes and must stay open"""
+        return any(fig is kept for kept, _ in self._figures.values())
     
     def chart_1_sales_by_genre_bar(self):
-        return chart_1_sales_by_genre_bar(self.df)
+        return self._draw('chart_1_sales_by_genre_bar')
     
     def chart_2_sales_trend_line(self):
-        return chart_2_sales_trend_line(self.df)
+        return self._draw('chart_2_sales_trend_line')
     
     def chart_3_market_share_pie(self):
-        return chart_3_market_share_pie(self.df)
+        return self._draw('chart_3_market_share_pie')
     
     def chart_4_price_vs_rating_scatter(self):
-        return chart_4_price_vs_rating_scatter(self.df)
+        return self._draw('chart_4_price_vs_rating_scatter')
     
     def chart_5_rating_distribution_histogram(self):
-        return chart_5_rating_distribution_histogram(self.df)
+        return self._draw('chart_5_rating_distribution_histogram')
     
     def chart_6_correlation_heatmap(self):
-        return chart_6_correlation_heatmap(self.df)
+        return self._draw('chart_6_correlation_heatmap')
     
     def chart_7_roi_by_publisher_box(self):
-        return chart_7_roi_by_publisher_box(self.df)
+        return self._draw('chart_7_roi_by_publisher_box')
     
     def chart_8_playtime_by_genre_violin(self):
-        return chart_8_playtime_by_genre_violin(self.df)
+        return self._draw('chart_8_playtime_by_genre_violin')
     
     def chart_9_stacked_revenue_area(self):
-        return chart_9_stacked_revenue_area(self.df)
+        return self._draw('chart_9_stacked_revenue_area')
     
     def chart_10_player_count_power_bubble(self):
-        return chart_10_player_count_power_bubble(self.df)
+        return self._draw('chart_10_player_count_power_bubble')
 
 
 __all__ = [
+    'CHARTS',
     'ChartGenerator',
+    'load_chart',
     'chart_1_sales_by_genre_bar',
     'chart_2_sales_trend_line',
     'chart_3_market_share_pie',
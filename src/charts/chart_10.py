@@ -1,26 +1,25 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import seaborn as sns
 
-def chart_10_player_count_power_bubble(df):
+from filters import select
+from labels import LabelLayer
+from render import autoscale_collections
+
+def chart_10_player_count_power_bubble(df, stats=None, filters=None):
     """Chart 10: Revenue vs Copies Sold by Genre"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    genre_metrics = df.groupby('Genre').agg({
-        'Revenue_Million': 'sum',
-        'Copies_Sold_Million': 'sum',
-        'Game_ID': 'count'
-    }).reset_index()
-    genre_metrics.columns = ['Genre', 'Revenue', 'Copies', 'Count']
-    
-    scatter = ax.scatter(genre_metrics['Copies'], genre_metrics['Revenue'], 
-                        s=genre_metrics['Count']*30, c=range(len(genre_metrics)), 
+    # One placeholder bubble and label per genre; refresh() moves and sizes them
+    count = len(stats.genre.size)
+    scatter = ax.scatter(np.zeros(count), np.zeros(count), 
+                        s=np.zeros(count), c=range(count), 
                         cmap='tab10', alpha=0.7, edgecolors='#212529', linewidth=2)
-    
-    for idx, row in genre_metrics.iterrows():
-        ax.annotate(row['Genre'], (row['Copies'], row['Revenue']), 
-                   fontsize=9, fontweight='bold', ha='center')
+    labels = LabelLayer(ax, fontsize=9, fontweight='bold', ha='center')
     
     ax.set_title('Chart 10: Revenue vs Copies Sold by Genre', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Total Copies Sold (Million)', fontsize=11, fontweight='bold')
@@ -34,11 +33,33 @@ def chart_10_player_count_power_bubble(df):
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    corr = genre_metrics['Copies'].corr(genre_metrics['Revenue'])
-    top_genre = genre_metrics.loc[genre_metrics['Revenue'].idxmax()]
-    text = f"Correlation: {corr:+.3f} | Top: {top_genre['Genre']} (${top_genre['Revenue']:.1f}M) | Avg Revenue: ${genre_metrics['Revenue'].mean():.1f}M"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#2E86AB', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#2E86AB', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update bubbles, labels and footer in place; False if the genres changed"""
+        genre = stats.genre
+        genre_metrics = pd.DataFrame({
+            'Revenue': genre.sum['Revenue_Million'],
+            'Copies': genre.sum['Copies_Sold_Million'],
+            'Count': genre.size
+        }).sort_index().rename_axis('Genre').reset_index()
+        if len(genre_metrics) != count:
+            return False
+    
+        points = genre_metrics[['Copies', 'Revenue']].to_numpy()
+        scatter.set_offsets(points)
+        scatter.set_sizes(genre_metrics['Count'] * 30)
+        # Biggest bubbles are labelled first
+        labels.set_labels(points[:, 0], points[:, 1], genre_metrics['Genre'].tolist(), priority=genre_metrics['Count'])
+    
+        autoscale_collections(ax, [scatter])
+    
+        corr = genre_metrics['Copies'].corr(genre_metrics['Revenue']) if count > 1 else float('nan')
+        top_genre = genre_metrics.loc[genre_metrics['Revenue'].idxmax()]
+        footer.set_text(f"Correlation: {corr:+.3f} | Top: {top_genre['Genre']} (${top_genre['Revenue']:.1f}M) | Avg Revenue: ${genre_metrics['Revenue'].mean():.1f}M")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
@@ -1,27 +1,29 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
-def chart_2_sales_trend_line(df):
+from filters import select
+from labels import LabelLayer
+from rollup import OTHER, top_n_other
+
+def chart_2_sales_trend_line(df, stats=None, filters=None):
     """Chart 2: Top 10 Publishers by Total Sales"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    pub_sales = df.groupby('Publisher')['Sales_Million'].sum().sort_values(ascending=False).head(10)
-    colors = sns.color_palette("viridis", len(pub_sales))
-    bars = ax.barh(range(len(pub_sales)), pub_sales.values, color=colors, edgecolor='#212529', linewidth=2)
+    count = min(10, len(stats.publisher.size))
+    colors = sns.color_palette("viridis", count)
+    bars = ax.barh(range(count), np.zeros(count), color=colors, edgecolor='#212529', linewidth=2)
+    labels = LabelLayer(ax, va='center', fontsize=9, fontweight='bold')
     
-    ax.set_yticks(range(len(pub_sales)))
-    ax.set_yticklabels(pub_sales.index, fontweight='bold', fontsize=10)
+    ax.set_yticks(range(count))
     ax.set_title('Chart 2: Top 10 Publishers by Total Sales', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Total Sales (Million USD)', fontsize=12, fontweight='bold')
     ax.grid(axis='x', alpha=0.3)
     ax.invert_yaxis()
     
-    for i, (bar, val) in enumerate(zip(bars, pub_sales.values)):
-        ax.text(val, bar.get_y() + bar.get_height()/2, f' ${val:.1f}M',
-               va='center', fontsize=9, fontweight='bold')
-    
     ax_legend = fig.add_subplot(gs[1])
     ax_legend.axis('off')
     ax_legend.text(0.02, 0.3, "Dark = Highest Sales  |  Bright = Lower Sales", fontsize=9,
@@ -29,9 +31,31 @@ def chart_2_sales_trend_line(df):
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    text = f"Leader: {pub_sales.index[0]} (${pub_sales.values[0]:.1f}M) | Avg: ${pub_sales.mean():.1f}M | Total: ${pub_sales.sum():.1f}M"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#06A77D', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#06A77D', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update bars, labels and footer in place; False if fewer publishers remain"""
+        # Top 10 by partial selection; the rest is only summarised in the footer
+        totals = stats.publisher.sum['Sales_Million']
+        pub_sales = top_n_other(totals, 10)
+        rest = pub_sales.pop(OTHER) if len(totals) > 10 else None
+        if len(pub_sales) != count:
+            return False
+        for bar, val in zip(bars, pub_sales.values):
+            bar.set_width(val)
+        labels.set_labels(pub_sales.values, range(count), [f' ${val:.1f}M' for val in pub_sales.values],
+                          priority=pub_sales.values)
+        ax.set_yticklabels(pub_sales.index, fontweight='bold', fontsize=10)
+        ax.relim()
+        ax.autoscale_view()
+    
+        text = f"Leader: {pub_sales.index[0]} (${pub_sales.values[0]:.1f}M) | Avg: ${pub_sales.mean():.1f}M | Total: ${pub_sales.sum():.1f}M"
+        if rest is not None:
+            text += f" | Other {len(totals) - count}: ${rest:.1f}M"
+        footer.set_text(text)
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
@@ -1,16 +1,23 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
-def chart_3_market_share_pie(df):
+from filters import select
+from rollup import top_n_other
+
+def chart_3_market_share_pie(df, stats=None, filters=None):
     """Chart 3: Market Share by Platform"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 1, 1])
     ax = fig.add_subplot(gs[0])
     
-    platform_revenue = df.groupby('Platform')['Revenue_Million'].sum().sort_values(ascending=False)
-    colors_pie = sns.color_palette("Set2", len(platform_revenue))
+    # At most 10 named slices; smaller platforms share one Other slice
+    count = min(11, len(stats.platform.size))
+    colors_pie = sns.color_palette("Set2", count)
     
-    wedges, texts, autotexts = ax.pie(platform_revenue.values, labels=platform_revenue.index,
+    # Equal placeholder wedges; refresh() sets their angles and texts
+    wedges, texts, autotexts = ax.pie(np.ones(count), labels=[''] * count,
                                        autopct='%1.1f%%', colors=colors_pie, startangle=90,
                                        textprops={'fontsize': 11, 'fontweight': 'bold'},
                                        wedgeprops={'edgecolor': '#212529', 'linewidth': 2})
@@ -23,16 +30,43 @@ def chart_3_market_share_pie(df):
     
     ax_legend = fig.add_subplot(gs[1])
     ax_legend.axis('off')
-    top_3 = platform_revenue.head(3)
-    total = platform_revenue.sum()
-    text = f"Top 3: {top_3.index[0]} ({top_3.values[0]/total*100:.1f}%) | {top_3.index[1]} ({top_3.values[1]/total*100:.1f}%) | {top_3.index[2]} ({top_3.values[2]/total*100:.1f}%)"
-    ax_legend.text(0.02, 0.5, text, fontsize=9, transform=ax_legend.transAxes, fontweight='bold')
+    top_text = ax_legend.text(0.02, 0.5, '', fontsize=9, transform=ax_legend.transAxes, fontweight='bold')
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    text = f"Total Revenue: ${total:.1f}M | Platforms: {len(platform_revenue)} | Leader: {platform_revenue.idxmax()} ({platform_revenue.max()/total*100:.1f}%)"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#06A77D', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#06A77D', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update wedge angles, labels and texts in place; False if the slice count changed"""
+        totals = stats.platform.sum['Revenue_Million']
+        platform_revenue = top_n_other(totals, 10)
+        if len(platform_revenue) != count:
+            return False
+        total = platform_revenue.sum()
+    
+        # Same geometry as Axes.pie: counterclockwise from 90 degrees
+        theta1 = 90 / 360
+        for wedge, label, autotext, name, val in zip(wedges, texts, autotexts, platform_revenue.index,
+                                                     platform_revenue.values):
+            frac = val / total
+            theta2 = theta1 + frac
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            middle = np.pi * (theta1 + theta2)
+            x, y = np.cos(middle), np.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            label.set_text(name)
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f'{frac * 100:.1f}%')
+            theta1 = theta2
+    
+        top_3 = " | ".join(f"{name} ({val/total*100:.1f}%)" for name, val in platform_revenue.head(3).items())
+        top_text.set_text(f"Top 3: {top_3}")
+        footer.set_text(f"Total Revenue: ${total:.1f}M | Platforms: {len(totals)} | Leader: {platform_revenue.index[0]} ({platform_revenue.values[0]/total*100:.1f}%)")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
@@ -2,43 +2,78 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
-def chart_5_rating_distribution_histogram(df):
+from filters import select
+
+def chart_5_rating_distribution_histogram(df, stats=None, filters=None):
     """Chart 5: Rating Distribution (Pi-based bins)"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
+    # Empty histogram with the final bin count; refresh() sets the bars
     bins = int(10 * np.pi / 3)
-    n, edges, patches = ax.hist(df['Rating'], bins=bins, color='#2E86AB', 
-                                 edgecolor='#212529', linewidth=1.5, alpha=0.85)
+    _, _, patches = ax.hist([], bins=bins, color='#2E86AB',
+                            edgecolor='#212529', linewidth=1.5, alpha=0.85)
     
     for i, patch in enumerate(patches):
         patch.set_facecolor(plt.cm.Blues(0.4 + 0.6 * (i / len(patches))))
     
-    mean_r = df['Rating'].mean()
-    median_r = df['Rating'].median()
-    
-    ax.axvline(mean_r, color='#C73E1D', linestyle='--', linewidth=2.5, label=f'Mean: {mean_r:.2f}')
-    ax.axvline(median_r, color='#06A77D', linestyle='-.', linewidth=2.5, label=f'Median: {median_r:.2f}')
+    mean_line = ax.axvline(0, color='#C73E1D', linestyle='--', linewidth=2.5, label='Mean')
+    median_line = ax.axvline(0, color='#06A77D', linestyle='-.', linewidth=2.5, label='Median')
     
     ax.set_title(f'Chart 5: Rating Distribution (Bins={bins} from 10π/3)', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Rating', fontsize=11, fontweight='bold')
     ax.set_ylabel('Count', fontsize=11, fontweight='bold')
     ax.grid(True, alpha=0.3, axis='y')
-    ax.legend(fontsize=9)
+    legend = ax.legend(fontsize=9)
     
     ax_legend = fig.add_subplot(gs[1])
     ax_legend.axis('off')
-    ax_legend.text(0.02, 0.3, f"Bins calculated as int(10 × π/3) = {bins}  |  Red = Mean  |  Green = Median", 
+    ax_legend.text(0.02, 0.3, f"Bins calculated as int(10 × π/3) = {bins}  |  Red = Mean  |  Green = Median",
                   fontsize=9, transform=ax_legend.transAxes, fontweight='bold', color='#2E86AB')
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    excellent = len(df[df['Rating'] >= 9])
-    very_good = len(df[(df['Rating'] >= 7) & (df['Rating'] < 9)])
-    text = f"Excellent (≥9): {excellent} | Very Good (7-9): {very_good} | Avg: {mean_r:.2f} | Std: {df['Rating'].std():.2f}"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#C73E1D', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#C73E1D', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update bars, mean/median lines and footer in place"""
+        if stats.sample is not None:
+            ratings = stats.sample['Rating']
+            scale = 1 / stats.sample_fraction
+            counts, edges = np.histogram(ratings, bins=bins, weights=np.full(len(ratings), scale))
+            excellent = round((ratings >= 9).sum() * scale)
+            very_good = round(((ratings >= 7) & (ratings < 9)).sum() * scale)
+        else:
+            # Persisted statistics without rows: bin the rating sketch instead
+            sketch = stats.sketch('Rating').sketch()
+            edges = np.linspace(sketch.min, sketch.max, bins + 1)
+            below = sketch.rank(edges)
+            below[-1] = 1.0
+            counts = np.diff(below) * sketch.count
+            below_7, below_9 = sketch.rank([7, 9])
+            excellent = round((1 - below_9) * sketch.count)
+            very_good = round((below_9 - below_7) * sketch.count)
+        for patch, val, left, right in zip(patches, counts, edges[:-1], edges[1:]):
+            patch.set_x(left)
+            patch.set_width(right - left)
+            patch.set_height(val)
+    
+        mean_r = stats.moments.mean['Rating']
+        median_r = stats.sketch('Rating').quantile(0.5)
+        for line, text, name, val in [(mean_line, legend.texts[0], 'Mean', mean_r),
+                                      (median_line, legend.texts[1], 'Median', median_r)]:
+            line.set_xdata([val, val])
+            line.set_label(f'{name}: {val:.2f}')
+            text.set_text(line.get_label())
+        ax.relim()
+        ax.autoscale_view()
+    
+        footer.set_text(f"Excellent (≥9): {excellent} | Very Good (7-9): {very_good} | Avg: {mean_r:.2f} | Std: {stats.moments.std['Rating']:.2f}")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
@@ -1,20 +1,29 @@
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import seaborn as sns
+from seaborn.utils import relative_luminance
 
-def chart_6_correlation_heatmap(df):
+from filters import select
+
+def chart_6_correlation_heatmap(df, stats=None, filters=None):
     """Chart 6: Correlation Matrix"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    numeric_cols = ['Price_USD', 'Sales_Million', 'Player_Count', 'Rating', 
-                   'Development_Cost_Million', 'Playtime_Hours', 'Revenue_Million', 'ROI_Percent']
-    corr_matrix = df[numeric_cols].corr()
+    # Zero matrix with the final labels; refresh() sets colours and annotations
+    numeric_cols = stats.moments.columns
+    placeholder = pd.DataFrame(0.0, index=numeric_cols, columns=numeric_cols)
     
-    sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', center=0,
+    sns.heatmap(placeholder, annot=True, fmt='.2f', cmap='coolwarm', center=0,
                square=True, ax=ax, cbar_kws={'label': 'Correlation'}, vmin=-1, vmax=1,
                linewidths=1.5, linecolor='#212529', annot_kws={'fontsize': 9, 'fontweight': 'bold'})
     
+    mesh = ax.collections[0]
+    annotations = list(ax.texts)
+    
     ax.set_title('Chart 6: Correlation Matrix (Pearson)', fontsize=16, fontweight='bold', pad=20)
     
     ax_legend = fig.add_subplot(gs[1])
@@ -24,13 +33,27 @@ def chart_6_correlation_heatmap(df):
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    corr_flat = [(numeric_cols[i], numeric_cols[j], corr_matrix.iloc[i, j]) 
-                for i in range(len(numeric_cols)) for j in range(i+1, len(numeric_cols))]
-    corr_flat.sort(key=lambda x: abs(x[2]), reverse=True)
-    top = corr_flat[0]
-    text = f"Strongest: {top[0]} ↔ {top[1]} ({top[2]:+.3f}) | Scale: -1 to +1"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#6C757D', linewidth=1.5))
-    
-    plt.tight_layout()
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#6C757D', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update cell colours, annotations and footer in place"""
+        # Pearson correlations of every row, from the one-pass co-moments
+        corr_matrix = stats.moments.corr
+        values = corr_matrix.to_numpy()
+        mesh.set_array(np.ma.masked_invalid(values).ravel())
+        # Same contrast rule seaborn uses when it annotates a heatmap
+        for text, val, color in zip(annotations, values.ravel(), mesh.cmap(mesh.norm(values.ravel()))):
+            text.set_text(f'{val:.2f}')
+            text.set_color('.15' if relative_luminance(color) > .408 else 'w')
+    
+        corr_flat = [(numeric_cols[i], numeric_cols[j], corr_matrix.iloc[i, j]) 
+                    for i in range(len(numeric_cols)) for j in range(i+1, len(numeric_cols))]
+        corr_flat.sort(key=lambda x: abs(x[2]), reverse=True)
+        top = corr_flat[0]
+        footer.set_text(f"Strongest: {top[0]} ↔ {top[1]} ({top[2]:+.3f}) | Scale: -1 to +1")
+        return True
+    
+    refresh(stats)
+    fig.refresh = refresh
     return fig
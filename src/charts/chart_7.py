@@ -1,27 +1,28 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
-def chart_7_roi_by_publisher_box(df):
+from filters import select
+from labels import LabelLayer
+
+def chart_7_roi_by_publisher_box(df, stats=None, filters=None):
     """Chart 7: Average Price by Genre"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    genre_price = df.groupby('Genre')['Price_USD'].mean().sort_values(ascending=False)
-    colors = sns.color_palette("rocket", len(genre_price))
-    bars = ax.barh(range(len(genre_price)), genre_price.values, color=colors, edgecolor='#212529', linewidth=2)
+    count = len(stats.genre.size)
+    colors = sns.color_palette("rocket", count)
+    bars = ax.barh(range(count), np.zeros(count), color=colors, edgecolor='#212529', linewidth=2)
+    labels = LabelLayer(ax, va='center', fontsize=9, fontweight='bold')
     
-    ax.set_yticks(range(len(genre_price)))
-    ax.set_yticklabels(genre_price.index, fontweight='bold', fontsize=10)
+    ax.set_yticks(range(count))
     ax.set_title('Chart 7: Average Game Price by Genre', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Average Price (USD)', fontsize=12, fontweight='bold')
     ax.grid(axis='x', alpha=0.3)
     ax.invert_yaxis()
     
-    for i, (bar, val) in enumerate(zip(bars, genre_price.values)):
-        ax.text(val, bar.get_y() + bar.get_height()/2, f' ${val:.2f}',
-               va='center', fontsize=9, fontweight='bold')
-    
     ax_legend = fig.add_subplot(gs[1])
     ax_legend.axis('off')
     ax_legend.text(0.02, 0.3, "Dark Red = Most Expensive  |  Yellow = Most Affordable", fontsize=9,
@@ -29,9 +30,25 @@ def chart_7_roi_by_publisher_box(df):
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    text = f"Most Expensive: {genre_price.index[0]} (${genre_price.values[0]:.2f}) | Avg: ${genre_price.mean():.2f} | Range: ${genre_price.min():.2f}-${genre_price.max():.2f}"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#C73E1D', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#C73E1D', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update bars, labels and footer in place; False if the genres changed"""
+        genre_price = stats.genre.mean['Price_USD'].sort_values(ascending=False)
+        if len(genre_price) != count:
+            return False
+        for bar, val in zip(bars, genre_price.values):
+            bar.set_width(val)
+        labels.set_labels(genre_price.values, range(count), [f' ${val:.2f}' for val in genre_price.values],
+                          priority=genre_price.values)
+        ax.set_yticklabels(genre_price.index, fontweight='bold', fontsize=10)
+        ax.relim()
+        ax.autoscale_view()
+    
+        footer.set_text(f"Most Expensive: {genre_price.index[0]} (${genre_price.values[0]:.2f}) | Avg: ${genre_price.mean():.2f} | Range: ${genre_price.min():.2f}-${genre_price.max():.2f}")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
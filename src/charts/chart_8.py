@@ -1,14 +1,28 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
-def chart_8_playtime_by_genre_violin(df):
+from filters import select
+from render import autoscale_collections
+
+def chart_8_playtime_by_genre_violin(df, stats=None, filters=None):
     """Chart 8: Playtime by Genre"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    sns.violinplot(data=df, x='Genre', y='Playtime_Hours', ax=ax, palette='muted', 
-                  hue='Genre', legend=False, inner='box')
+    # Empty violins and box marks per genre; refresh() sets their geometry
+    genres = stats.playtime.groups
+    colors = [sns.desaturate(color, 0.75) for color in sns.color_palette('muted', len(genres))]
+    violins, whiskers, boxes, medians = [], [], [], []
+    for i in range(len(genres)):
+        violins.append(ax.fill_betweenx([0, 0], i, i, facecolor=colors[i], edgecolor='0.25', linewidth=1))
+        whiskers.append(ax.vlines(i, 0, 0, color='0.25', linewidth=1.5))
+        boxes.append(ax.vlines(i, 0, 0, color='0.25', linewidth=6))
+        medians.append(ax.scatter(i, 0, color='white', s=20, zorder=3))
+    ax.set_xticks(np.arange(len(genres)), genres)
+    ax.set_xlim(-0.5, len(genres) - 0.5)
     
     ax.set_title('Chart 8: Playtime Distribution by Genre', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Genre', fontsize=11, fontweight='bold')
@@ -23,11 +37,35 @@ def chart_8_playtime_by_genre_violin(df):
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    genre_stats = df.groupby('Genre')['Playtime_Hours'].agg(['mean', 'median', 'count']).sort_values('mean', ascending=False)
-    top_genre = genre_stats.index[0]
-    text = f"Top Genre: {top_genre} (Avg: {genre_stats.loc[top_genre, 'mean']:.1f}h) | Overall Avg: {df['Playtime_Hours'].mean():.1f}h"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#A23B72', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#A23B72', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update violins, box marks and footer in place; False if the genres changed"""
+        # Violins from binned KDEs, so drawing cost does not grow with row count
+        playtime = stats.playtime
+        if playtime.groups != genres:
+            return False
+        densities = [playtime.kde(genre) for genre in genres]
+        scale = 0.4 / max(density.max() for _, density in densities)  # equal areas, like seaborn
+        for i, (genre, (grid, density)) in enumerate(zip(genres, densities)):
+            half = density * scale
+            violins[i].set_data(grid, i - half, i + half)
+    
+            sketch = stats.sketch('Playtime_Hours').sketch(genre)
+            q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+            low, high = sketch.min, sketch.max
+            whiskers[i].set_segments([[(i, max(low, q1 - 1.5 * (q3 - q1))), (i, min(high, q3 + 1.5 * (q3 - q1)))]])
+            boxes[i].set_segments([[(i, q1), (i, q3)]])
+            medians[i].set_offsets([[i, median]])
+    
+        autoscale_collections(ax, ax.collections)
+    
+        genre_playtime = stats.genre.mean['Playtime_Hours'].sort_values(ascending=False)
+        top_genre = genre_playtime.index[0]
+        footer.set_text(f"Top Genre: {top_genre} (Avg: {genre_playtime[top_genre]:.1f}h) | Overall Avg: {stats.moments.mean['Playtime_Hours']:.1f}h")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
@@ -1,37 +1,64 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 
-def chart_9_stacked_revenue_area(df):
+from filters import select
+from render import autoscale_collections
+from rollup import OTHER, lump, top_n
+
+def chart_9_stacked_revenue_area(df, stats=None, filters=None):
     """Chart 9: Revenue Trends by Genre"""
+    df, stats = select(df, stats, filters)
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 1, height_ratios=[5.5, 0.5, 1])
     ax = fig.add_subplot(gs[0])
     
-    top_genres = df.groupby('Genre')['Revenue_Million'].sum().nlargest(6).index
-    df_top = df[df['Genre'].isin(top_genres)]
-    pivot = df_top.pivot_table(values='Revenue_Million', index='Release_Year', columns='Genre', aggfunc='sum', fill_value=0)
-    
-    colors = sns.color_palette("husl", len(pivot.columns))
-    ax.stackplot(pivot.index, pivot.T, labels=pivot.columns, colors=colors, alpha=0.8, 
-                edgecolor='#212529', linewidth=1.5)
+    # Flat placeholder layers; refresh() sets the years, stack and genre names
+    genres = len(stats.genre.size)
+    colors = sns.color_palette("husl", min(6, genres)) + (['#ADB5BD'] if genres > 6 else [])
+    count = len(colors)
+    layers = ax.stackplot([0, 1], np.zeros((count, 2)), labels=[str(i) for i in range(count)], colors=colors,
+                          alpha=0.8, edgecolor='#212529', linewidth=1.5)
     
     ax.set_title('Chart 9: Revenue Trends by Genre Over Time', fontsize=16, fontweight='bold', pad=20)
     ax.set_xlabel('Year', fontsize=11, fontweight='bold')
     ax.set_ylabel('Revenue (Million $)', fontsize=11, fontweight='bold')
-    ax.legend(loc='upper left', fontsize=8, ncol=2)
+    legend = ax.legend(loc='upper left', fontsize=8, ncol=2)
     ax.grid(True, alpha=0.3)
     
     ax_legend = fig.add_subplot(gs[1])
     ax_legend.axis('off')
-    ax_legend.text(0.02, 0.3, "Each color = Different genre  |  Height = Revenue contribution  |  Top 6 genres shown", 
+    ax_legend.text(0.02, 0.3, "Each color = Different genre  |  Height = Revenue contribution  |  Top 6 genres + Other", 
                   fontsize=9, transform=ax_legend.transAxes, fontweight='bold', color='#2E86AB')
     
     ax_stats = fig.add_subplot(gs[2])
     ax_stats.axis('off')
-    year_totals = pivot.sum(axis=1)
-    text = f"Peak Year: {year_totals.idxmax()} (${year_totals.max():.1f}M) | Total Revenue: ${year_totals.sum():.1f}M"
-    ax_stats.text(0.01, 0.5, text, fontsize=9, verticalalignment='center', family='monospace',
-                 bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#F18F01', linewidth=1.5))
+    footer = ax_stats.text(0.01, 0.5, '', fontsize=9, verticalalignment='center', family='monospace',
+                           bbox=dict(boxstyle='round,pad=0.6', facecolor='#FFFACD', edgecolor='#F18F01', linewidth=1.5))
+    
+    def refresh(stats):
+        """Update the stacked layers, legend and footer in place; False if the layer count changed"""
+        totals = stats.genre.sum['Revenue_Million']
+        order = sorted(top_n(totals, 6).index) + ([OTHER] if len(totals) > 6 else [])
+        if len(order) != count:
+            return False
+        # Genres outside the top 6 are merged into one Other layer before pivoting
+        year_genre = lump(stats.year_genre, order, level='Genre')
+        pivot = year_genre.sum['Revenue_Million'].unstack('Genre', fill_value=0)[order].sort_index()
+    
+        # Same layering as stackplot's zero baseline
+        stack = np.vstack([np.zeros(len(pivot)), np.cumsum(pivot.T.to_numpy(), axis=0)])
+        for i, (layer, text, name) in enumerate(zip(layers, legend.texts, pivot.columns)):
+            layer.set_data(pivot.index, stack[i], stack[i + 1])
+            layer.set_label(name)
+            text.set_text(name)
+    
+        autoscale_collections(ax, layers)
+    
+        year_totals = pivot.sum(axis=1)
+        footer.set_text(f"Peak Year: {year_totals.idxmax()} (${year_totals.max():.1f}M) | Total Revenue: ${year_totals.sum():.1f}M")
+        return True
     
-    plt.tight_layout()
+    refresh(stats)
+    fig.refresh = refresh
     return fig
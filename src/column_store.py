@@ -0,0 +1,315 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+def frame_fingerprint(df):
+    """Identity hash of a DataFrame, reusing the source file's hash when known"""
+    if df.attrs.get('fingerprint'):
+        return df.attrs['fingerprint']
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _append_npy(path, values):
+    """Append values to a 1-D .npy file in place; False if its header would change size"""
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        header_size = f.tell()
+        if len(shape) != 1:
+            return False
+
+        header = io.BytesIO()
+        write_header = np.lib.format.write_array_header_1_0 if version == (1, 0) else np.lib.format.write_array_header_2_0
+        write_header(header, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                              'shape': (shape[0] + len(values),)})
+        if len(header.getvalue()) != header_size:
+            return False
+
+        # Data first, then the header, so the header never counts missing rows
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+def _replace_npy(path, values):
+    """Rewrite a .npy file as a new file, so processes mapping the old one are unaffected"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp_path, path)
+
+
+class ColumnStore:
+    """Binary columnar cache of a CSV file, one .npy file per column
+
+    Numeric columns are loaded as read-only memory maps of their .npy
+    files: no copy is made on load, the OS page cache holds the data, and
+    every process loading the same cache shares one physical copy. Files
+    are only ever appended to or replaced, never rewritten in place, so
+    existing maps stay valid.
+    """
+
+    META_FILE = 'meta.json'
+    FORMAT_VERSION = 1
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, csv_path, cache_dir=None, schema_version=None):
+        self.csv_path = csv_path
+        self.schema_version = schema_version
+        self.cache_dir = cache_dir or os.path.splitext(csv_path)[0] + '.columns'
+        self.meta_path = os.path.join(self.cache_dir, self.META_FILE)
+
+    @classmethod
+    def _hash_blocks(cls, f, digest, length=None):
+        """Feed `length` bytes of f (default: the rest) into digest, in fixed-size blocks"""
+        while length is None or length > 0:
+            block = f.read(cls.HASH_BLOCK_SIZE if length is None else min(cls.HASH_BLOCK_SIZE, length))
+            if not block:
+                break
+            digest.update(block)
+            if length is not None:
+                length -= len(block)
+        return digest
+
+    @staticmethod
+    def chain_digest(digest, data):
+        """Hash of a file after appending `data` to one whose hash is `digest`"""
+        chained = hashlib.blake2b(digest.encode('ascii'), digest_size=16)
+        chained.update(data)
+        return chained.hexdigest()
+
+    @classmethod
+    def file_digest(cls, path, appends=()):
+        """Content hash of a file, read in fixed-size blocks
+
+        `appends` lists the file sizes before each append: the bytes after
+        each one are chained onto the hash of those before (chain_digest),
+        as append() computes it without reading the earlier bytes.
+        """
+        ends = list(appends) + [None]
+        with open(path, 'rb') as f:
+            digest = cls._hash_blocks(f, hashlib.blake2b(digest_size=16), ends[0]).hexdigest()
+            for start, end in zip(ends, ends[1:]):
+                chained = hashlib.blake2b(digest.encode('ascii'), digest_size=16)
+                digest = cls._hash_blocks(f, chained, None if end is None else end - start).hexdigest()
+        return digest
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != self.FORMAT_VERSION:
+            return None
+        if meta.get('schema') != self.schema_version:
+            return None
+        return meta
+
+    def _write_meta(self, meta, cache_dir=None):
+        meta_path = os.path.join(cache_dir or self.cache_dir, self.META_FILE)
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, meta_path)
+
+    def _source_state(self):
+        stat = os.stat(self.csv_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def is_fresh(self, meta=None):
+        """Check the cache against the CSV's size, mtime and content hash"""
+        meta = meta or self._read_meta()
+        if meta is None or not os.path.exists(self.csv_path):
+            return False
+
+        source = meta['source']
+        state = self._source_state()
+        if state['size'] != source['size']:
+            return False
+        if state['mtime_ns'] == source['mtime_ns']:
+            return True
+
+        # Same size but touched: only the content hash can tell
+        if self.file_digest(self.csv_path, source.get('appends', [])) != source['digest']:
+            return False
+        source['mtime_ns'] = state['mtime_ns']
+        self._write_meta(meta)
+        return True
+
+    @property
+    def fingerprint(self):
+        """Content hash of the CSV the cache was built from"""
+        meta = self._read_meta()
+        return meta['source']['digest'] if meta else None
+
+    @property
+    def rows(self):
+        """Row count of the cached data, or None without a cache"""
+        meta = self._read_meta()
+        return meta['rows'] if meta else None
+
+    def _column_path(self, index, suffix, cache_dir=None):
+        return os.path.join(cache_dir or self.cache_dir, f"{index:03d}_{suffix}.npy")
+
+    def save(self, df):
+        """Write every column of df to the cache, tagged with the CSV state
+
+        The cache is built in a per-process directory and moved into place,
+        so processes saving at the same time never see each other's files.
+        """
+        state = self._source_state()
+        state['digest'] = self.file_digest(self.csv_path)
+
+        build_dir = f"{self.cache_dir}.{os.getpid()}.tmp"
+        if os.path.exists(build_dir):
+            shutil.rmtree(build_dir)
+        os.makedirs(build_dir)
+
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                entry = {'name': name, 'kind': 'category', 'ordered': bool(series.cat.ordered)}
+                codes = series.cat.codes.to_numpy()
+                categories = series.cat.categories
+            elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                np.save(self._column_path(i, 'values', build_dir), series.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric'})
+                continue
+            else:
+                entry = {'name': name, 'kind': 'string', 'dtype': str(series.dtype)}
+                codes, categories = pd.factorize(series)
+
+            np.save(self._column_path(i, 'codes', build_dir), codes)
+            np.save(self._column_path(i, 'categories', build_dir), np.asarray(categories, dtype=str))
+            columns.append(entry)
+
+        # Meta is written last so a partially written cache is never used
+        self._write_meta({
+            'version': self.FORMAT_VERSION,
+            'schema': self.schema_version,
+            'rows': len(df),
+            'source': state,
+            'columns': columns,
+        }, build_dir)
+        self._replace_dir(build_dir)
+
+    def _replace_dir(self, build_dir):
+        """Move a finished cache directory into place, retiring the old one"""
+        old_dir = f"{self.cache_dir}.{os.getpid()}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        try:
+            os.replace(self.cache_dir, old_dir)
+        except OSError:
+            old_dir = None
+        try:
+            os.replace(build_dir, self.cache_dir)
+        except OSError:
+            # Another process moved its cache of the same CSV in first
+            shutil.rmtree(build_dir, ignore_errors=True)
+        if old_dir:
+            # Open memory maps of the old files stay valid after the unlink
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _append_array(self, path, values):
+        if not _append_npy(path, values):
+            existing = np.load(path, mmap_mode='r')
+            _replace_npy(path, np.concatenate([existing, values.astype(existing.dtype)]))
+
+    def _append_codes(self, index, entry, series):
+        codes_path = self._column_path(index, 'codes')
+        categories_path = self._column_path(index, 'categories')
+        categories = np.load(categories_path)
+        values = series.astype(str).to_numpy(dtype=str)
+        codes = pd.Index(categories).get_indexer(values)
+        if (codes >= 0).all():
+            self._append_array(codes_path, codes)
+            return
+        if entry.get('ordered'):
+            raise ValueError(f"Unknown values for ordered column {entry['name']}")
+
+        # New values: order categories as a fresh load would (sorted for
+        # categoricals, first appearance for strings) and remap the old codes
+        if entry['kind'] == 'category':
+            merged = np.union1d(categories, values)
+            remap = np.searchsorted(merged, categories)
+        else:
+            merged = np.concatenate([categories, pd.unique(values[codes < 0])])
+            remap = np.arange(len(categories))
+        old_codes = np.load(codes_path)
+        dtype = old_codes.dtype if len(merged) <= np.iinfo(old_codes.dtype).max else np.int32
+        new_codes = pd.Index(merged).get_indexer(values)
+        _replace_npy(codes_path, np.concatenate([remap[old_codes], new_codes]).astype(dtype))
+        _replace_npy(categories_path, np.asarray(merged, dtype=str))
+
+    def append(self, df):
+        """Append rows already added to the CSV to the cache, in place
+
+        The cache must have matched the CSV before those rows were written;
+        returns False (leaving the cache stale) if it did not exist.
+        """
+        meta = self._read_meta()
+        if meta is None or [entry['name'] for entry in meta['columns']] != list(df.columns):
+            return False
+
+        for i, entry in enumerate(meta['columns']):
+            series = df[entry['name']]
+            if entry['kind'] == 'numeric':
+                self._append_array(self._column_path(i, 'values'), series.to_numpy())
+            else:
+                self._append_codes(i, entry, series)
+
+        # Hash only the appended bytes, chained onto the previous hash
+        source = meta['source']
+        state = self._source_state()
+        with open(self.csv_path, 'rb') as f:
+            f.seek(source['size'])
+            state['digest'] = self.chain_digest(source['digest'], f.read())
+        state['appends'] = source.get('appends', []) + [source['size']]
+        meta['rows'] += len(df)
+        meta['source'] = state
+        self._write_meta(meta)
+        return True
+
+    def load(self, mmap=True):
+        """Load the cached DataFrame, or None if the cache is missing or stale
+
+        With mmap, numeric columns are zero-copy, read-only views of the
+        cache files.
+        """
+        meta = self._read_meta()
+        if not self.is_fresh(meta):
+            return None
+
+        data = {}
+        try:
+            for i, entry in enumerate(meta['columns']):
+                if entry['kind'] == 'numeric':
+                    data[entry['name']] = np.load(self._column_path(i, 'values'), mmap_mode='r' if mmap else None)
+                    continue
+
+                codes = np.load(self._column_path(i, 'codes'))
+                categories = np.load(self._column_path(i, 'categories'))
+                values = pd.Categorical.from_codes(codes, categories=categories,
+                                                   ordered=entry.get('ordered', False))
+                if entry['kind'] == 'string':
+                    values = pd.Series(values).astype(entry['dtype'])
+                data[entry['name']] = values
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # copy=False keeps each column as its own (mapped) block
+        return pd.DataFrame(data, copy=False)
@@ -1,140 +1,164 @@
-import pandas as pd
-import numpy as np
+import hashlib
+import io
 import os
 
+import pandas as pd
+
+from aggregates import DatasetStats
+from column_store import ColumnStore, frame_fingerprint
+from derived import DERIVED_COLUMNS, ensure
+from generator import DEFAULT_CHUNK_SIZE, DEFAULT_SEED, generate_csv
+from instrumentation import instrumented
+from schema import SCHEMA_VERSION, read_csv, schema_report
+from streaming import DEFAULT_CHUNK_SIZE as STREAM_CHUNK_SIZE, DEFAULT_SAMPLE_SIZE, stream_csv
+
 class VideoGameDatabase:
-    """Generate and manage video game database"""
+    """Generate and manage video game database
     
-    def __init__(self, data_dir='data'):
+    With mmap=True, load_database() memory-maps numeric columns from the
+    columnar cache instead of reading them: loading is cheap and processes
+    share one copy, but the columns are read-only, so writing to the frame
+    raises ValueError. The dashboard's own read-only processes use it.
+    """
+    
+    def __init__(self, data_dir='data', mmap=False):
         self.data_dir = data_dir
+        self.mmap = mmap
         self.csv_path = os.path.join(data_dir, 'video_games.csv')
+        self.column_store = ColumnStore(self.csv_path, schema_version=SCHEMA_VERSION)
+        self.stats_path = os.path.join(data_dir, 'video_games.stats.pkl')
         
         # Ensure data directory exists
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
-    def generate_database(self):
-        """Generate video game dataset and save to CSV"""
-        np.random.seed(42)
+    def generate_database(self, num_games=1000, seed=DEFAULT_SEED, workers=1,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+        """Generate video game dataset and save to CSV
         
-        # Real game names from the industry
-        real_game_names = [
-            'The Legend of Zelda: Breath of the Wild', 'Super Mario Odyssey', 'Mario Kart 8 Deluxe',
-            'Animal Crossing: New Horizons', 'Splatoon 3', 'Elden Ring', 'Baldur\'s Gate 3',
-            'Cyberpunk 2077', 'The Witcher 3', 'Red Dead Redemption 2', 'Grand Theft Auto V',
-            'Minecraft', 'Fortnite', 'Call of Duty: Modern Warfare', 'Valorant',
-            'Counter-Strike 2', 'Dota 2', 'League of Legends', 'Overwatch 2', 'Apex Legends',
-            'Halo Infinite', 'Xbox Game Pass', 'Starfield', 'Palworld', 'Dragon\'s Dogma 2',
-            'Street Fighter 6', 'Final Fantasy XVI', 'Final Fantasy VII Remake', 'Kingdom Hearts III',
-            'Monster Hunter: World', 'Dark Souls 3', 'Bloodborne', 'Sekiro: Shadows Die Twice',
-            'Horizon Zero Dawn', 'God of War Ragnarök', 'Spider-Man 2', 'Ghost of Tsushima',
-            'The Last of Us Part II', 'Uncharted 4', 'Death Stranding', 'Cyberpunk 2077',
-            'Starfield', 'Fallout 4', 'Skyrim', 'Oblivion', 'Morrowind',
-            'Team Fortress 2', 'Portal 2', 'Half-Life 3', 'Left 4 Dead 2', 'Dying Light 2',
-            'Resident Evil 4 Remake', 'Silent Hill 2 Remake', 'Outlast 3', 'Amnesia Collection',
-            'Subnautica', 'No Man\'s Sky', 'Star Citizen', 'Kerbal Space Program', 'Microsoft Flight Sim',
-            'NASCAR Heat 5', 'F1 24', 'Gran Turismo 7', 'Forza Motorsport 8', 'Need for Speed Unbound',
-            'FIFA 24', 'NBA 2K24', 'Madden NFL 24', 'WWE 2K24', 'PGA Tour 2K24',
-            'Tetris Effect', 'Puyo Puyo Tetris', 'Bejeweled 3', 'Candy Crush Saga', 'Portal Knights',
-            'The Sims 4', 'Cities Skylines 2', 'Planet Coaster 2', 'Two Point Hospital', 'Farming Simulator 23',
-            'Deus Ex: Mankind Divided', 'Splinter Cell Remake', 'Hitman 3', 'Dishonored 2', 'Prey',
-            'Outer Wilds', 'A Short Hike', 'Unpacking', 'Return of the Obra Dinn', 'Gris',
-            'Hollow Knight', 'Dead Cells', 'Risk of Rain 2', 'Hades', 'Celeste',
-            'Cuphead', 'Spiritfarer', 'Disco Elysium', 'Persona 5 Royal', 'Fire Emblem: Three Houses',
-            'Diablo IV', 'Path of Exile 2', 'Lost Ark', 'World of Warcraft', 'Final Fantasy XIV',
-            'Elder Scrolls Online', 'Guild Wars 2', 'New World', 'Albion Online', 'RuneScape 3',
-            'Pokémon Scarlet & Violet', 'Pokémon Legends Arceus', 'Pokémon Sword & Shield', 'Pokémon Legends Legends',
-            'Metroid Prime Remastered', 'Metroid Dread', 'Castlevania: Nocturne', 'Mega Man 11', 'Contra: Operation Galuga',
-            'Starcraft II', 'Total War: Warhammer III', 'Age of Empires IV', 'Company of Heroes 3', 'They Are Billions',
-            'XCOM 2', 'Civilization VI', 'Crusader Kings III', 'Stellaris', 'Europa Universalis IV',
-            'Warcraft III Reforged', 'Command & Conquer Remastered', 'Red Alert 4', 'Tiberium Alliances', 'Act of War',
-            'Death\'s Door', 'Salt and Sanctuary', 'Blasphemous', 'Limbo', 'Inside',
-            'Journey', 'Abzu', 'Flower', 'Kena: Bridge of Spirits', 'A Plague Tale',
-            'Heavy Rain', 'Detroit: Become Human', 'Quantum Break', 'Alan Wake', 'Control',
-            'Psychonauts 2', 'Ghostrunner', 'Slime Rancher', 'Grounded', 'No Man\'s Sky',
-            'Stardew Valley', 'Slime Rancher 2', 'Core Keeper', 'Roots of Pacha', 'Everspace 2',
-            'Star Wars Jedi: Survivor', 'Star Wars Jedi: Fallen Order', 'Star Wars Battlefront 2', 'Star Wars: The Old Republic',
-            'Warhammer 40K Darktide', 'Warhammer Vermintide 2', 'Warhammer 40K Space Marine 2', 'Warhammer Age of Sigmar',
-            'Back 4 Blood', 'Killing Floor 2', 'Deep Rock Galactic', 'Helldivers 2', 'Gunfire Reborn',
-            'Sea of Thieves', 'Skull and Bones', 'Pirate101', 'Naval Action', 'Windbound',
-            'It Takes Two', 'A Way Out', 'Overcooked 2', 'Moving Out', 'Unravel 2',
-            'Jackbox Party Packs', 'Among Us', 'Fall Guys', 'Stumble Guys', 'Gartic Phone',
-            'VRChat', 'Beat Saber', 'Half-Life Alyx', 'The Lab', 'Pavlov VR',
-            'Silent Hill Village', 'Resident Evil 8', 'Evil Within 2', 'Alibi', 'Phasmophobia',
-            'Inscryption', 'Slay the Spire', 'Monster Train', 'Hades II', 'Peglin',
-            'Vampire Survivors', 'Magic Survival', 'Brotato', 'Halls of Torment', 'Eatventure',
-            'Hi-Fi Rush', 'Crypt of the NecroDancer', 'Audica', 'Frets on Fire', 'Guitar Hero Live',
-            'Rock Band 4', 'Just Dance 2024', 'Dance Central', 'Zumba Fitness', 'Ring Fit Adventure',
-            'Switch Sports', 'Wii Sports Resort', 'Kinect Sports', 'PlayStation Move Sports', 'VR Sports',
-            'Lies of P', 'Homunculus', 'Salt and Sacrifice', 'Furi', 'Crosscode',
-            'ULTRAKILL', 'Dusk', 'Project Warlock', 'Ion Maiden', 'Prodeus',
-            'Retro City Rampage', 'Hotline Miami', 'Papers Please', 'Return of the Obra Dinn', 'Outer Wilds',
-            'Noita', 'Spelunky 2', 'Caveblazers', 'Juiced 2', 'OutRun 2',
-            'Burnout Revenge', 'Burnout Paradise', 'Split Second', 'Motorstorm', 'Wipeout HD',
-            'F-Zero GX', 'Ridge Racer', 'Initial D Arcade Stage', 'Daytona USA', 'Cruisin Exotica',
-            'Transformers: Fall of Cybertron', 'LEGO Video Games Series', 'Marvel Spider-Man', 'DC Batman Series',
-            'Sonic Adventure 2', 'Shadow the Hedgehog', 'Sonic Generations', 'Sonic Frontiers', 'Sonic Mania'
-        ]
+        Large datasets are built chunk by chunk across worker processes;
+        the output is identical for any number of workers.
+        """
+        generate_csv(self.csv_path, num_games, seed=seed, chunk_size=chunk_size, workers=workers)
+        print(f"Database created: {self.csv_path}")
+        print(f"Total records: {num_games}")
         
-        genres = ['Action', 'RPG', 'Strategy', 'Sports', 'Shooter', 'Adventure', 
-                  'Racing', 'Puzzle', 'Simulation', 'Indie', 'Horror', 'Fighting']
-        platforms = ['PS5', 'Xbox Series X', 'Nintendo Switch', 'PC', 'PS4', 
-                     'Xbox One', 'Mobile', 'VR', 'Steam Deck']
-        publishers = ['Sony', 'Microsoft', 'Nintendo', 'Activision Blizzard', 
-                      'EA Sports', 'Ubisoft', 'Take-Two', 'Rockstar Games',
-                      'Bethesda', 'Epic Games', 'Square Enix', 'Capcom', 'Bandai Namco',
-                      'Konami', 'Sega', 'CD Projekt Red', 'FromSoftware', 'Fromsoftware Bandai']
+        return self.load_database()
+    
+    @instrumented('load_database')
+    def load_database(self, use_cache=True):
+        """Load database from the columnar cache, falling back to the CSV file"""
+        if not os.path.exists(self.csv_path):
+            print("Database not found. Creating new database...")
+            return self.generate_database()
         
-        num_games = 1000  # Increased to 1000 games
+        df = self.column_store.load(mmap=self.mmap) if use_cache else None
+        if df is not None:
+            df.attrs['fingerprint'] = self.column_store.fingerprint
+            print(f"Database loaded: {self.csv_path} (columnar cache)")
+            print(f"Total records: {len(df)}")
+            return df
         
-        # Ensure we have enough game names
-        game_names = (real_game_names * ((num_games // len(real_game_names)) + 1))[:num_games]
-        np.random.shuffle(game_names)
+        df = read_csv(self.csv_path)
+        if use_cache:
+            self.column_store.save(df)
+        df.attrs['fingerprint'] = self.fingerprint()
+        print(f"Database loaded: {self.csv_path}")
+        print(f"Total records: {len(df)}")
+        return df
+    
+    def fingerprint(self):
+        """Content hash of the dataset, from the columnar cache when it is fresh"""
+        if self.column_store.is_fresh():
+            return self.column_store.fingerprint
+        return ColumnStore.file_digest(self.csv_path)
+    
+    def load_stats(self, df=None):
+        """Persisted aggregates of the current data, computed and saved if missing or stale
         
-        data = {
-            'Game_ID': range(1, num_games + 1),
-            'Game_Name': game_names,
-            'Genre': np.random.choice(genres, num_games),
-            'Platform': np.random.choice(platforms, num_games),
-            'Publisher': np.random.choice(publishers, num_games),
-            'Release_Year': np.random.randint(2010, 2025, num_games),
-            'Price_USD': np.random.uniform(5, 70, num_games),
-            'Sales_Million': np.random.exponential(5, num_games) + 0.5,
-            'Player_Count': np.random.randint(1000, 50000000, num_games),
-            'Rating': np.random.uniform(1, 10, num_games),
-            'Development_Cost_Million': np.random.uniform(1, 300, num_games),
-            'Playtime_Hours': np.random.uniform(2, 200, num_games),
-            'Metacritic_Score': np.random.uniform(20, 98, num_games),
-            'Copies_Sold_Million': np.random.exponential(3, num_games) + 0.1,
-            'Budget_Million': np.random.uniform(5, 250, num_games),
-        }
+        `df` is attached for the sample-based charts (and scanned only when
+        no matching aggregates are on disk). Aggregates are only saved for
+        the current data: a frame loaded before the data changed (e.g. by
+        append_records) gets statistics of its own rows, and must be
+        reloaded with load_database() to include the new ones.
+        """
+        current = self.fingerprint()
+        fingerprint = frame_fingerprint(df) if df is not None else current
+        stats = DatasetStats.load(self.stats_path, fingerprint, df)
+        if stats is None:
+            stats = DatasetStats(df if df is not None else self.load_database())
+            stats.fingerprint = fingerprint
+            if fingerprint == current:
+                stats.save(self.stats_path)
+        return stats
+    
+    def _row_count(self):
+        if self.column_store.is_fresh():
+            return self.column_store.rows
+        with open(self.csv_path, 'rb') as f:
+            return sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b'')) - 1
+    
+    def append_records(self, records):
+        """Append new games without rescanning the existing ones
         
-        df = pd.DataFrame(data)
-        df['Revenue_Million'] = df['Copies_Sold_Million'] * df['Price_USD']
-        df['ROI_Percent'] = ((df['Revenue_Million'] - df['Development_Cost_Million']) 
-                             / df['Development_Cost_Million'] * 100)
-        df['Engagement_Score'] = (df['Rating'] * df['Player_Count'] / 1000000)
-        df['Profitability_Grade'] = pd.cut(df['ROI_Percent'], 
-                                           bins=[-np.inf, -50, 0, 50, 100, 500, np.inf],
-                                           labels=['F', 'D', 'C', 'B', 'A', 'S'])
+        `records` (a DataFrame or list of dicts) holds the base columns;
+        Game_ID is assigned if missing. The new rows are appended to the
+        CSV, the columnar cache and the persisted aggregates in place.
+        Derived columns are only written for CSVs from older versions
+        that still carry them. Returns the new rows; frames loaded before
+        the append do not include them, reload with load_database().
+        """
+        if not os.path.exists(self.csv_path):
+            self.generate_database()
         
-        # Save to CSV
-        df.to_csv(self.csv_path, index=False)
-        print(f"Database created: {self.csv_path}")
-        print(f"Total records: {len(df)}")
+        new = pd.DataFrame(records)
+        columns = list(pd.read_csv(self.csv_path, nrows=0).columns)
+        missing = [col for col in columns if col not in new.columns and col not in DERIVED_COLUMNS + ['Game_ID']]
+        if missing:
+            raise ValueError(f"Records are missing columns: {', '.join(missing)}")
+        if 'Game_ID' not in new.columns:
+            start = self._row_count() + 1
+            new['Game_ID'] = range(start, start + len(new))
+        text = ensure(new, columns)[columns].to_csv(header=False, index=False)
+        # Parse the rows back so cache and aggregates hold exactly what a reload would
+        new = read_csv(io.StringIO(text), header=None, names=columns)
         
-        return df
+        # Check what is in step with the CSV before it changes
+        cache_fresh = self.column_store.is_fresh()
+        stats = DatasetStats.load(self.stats_path, self.fingerprint())
+        
+        with open(self.csv_path, 'a', encoding='utf-8', newline='') as f:
+            f.write(text)
+        if cache_fresh:
+            self.column_store.append(new)
+        if stats is not None:
+            stats.update(new)
+            stats.fingerprint = self.fingerprint()
+            stats.save(self.stats_path)
+        
+        print(f"Appended {len(new)} records to {self.csv_path}")
+        return new
     
-    def load_database(self):
-        """Load database from CSV file"""
+    def stream_fingerprint(self, chunksize=STREAM_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE):
+        """Identity of the statistics stream_database() returns: the data, chunk and sample size
+        
+        Charts drawn from a sample differ from charts of every row, so
+        they are keyed apart from the dataset's own fingerprint.
+        """
+        key = f"{self.fingerprint()}|stream|{chunksize}|{sample_size}"
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def stream_database(self, chunksize=STREAM_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE):
+        """Aggregate the CSV chunk by chunk for files larger than memory"""
         if not os.path.exists(self.csv_path):
             print("Database not found. Creating new database...")
-            return self.generate_database()
+            self.generate_database()
         
-        df = pd.read_csv(self.csv_path)
-        print(f"Database loaded: {self.csv_path}")
-        print(f"Total records: {len(df)}")
-        return df
+        stats = stream_csv(self.csv_path, chunksize=chunksize, sample_size=sample_size)
+        stats.fingerprint = self.stream_fingerprint(chunksize, sample_size)
+        print(f"Database streamed: {self.csv_path}")
+        print(f"Total records: {stats.rows} (sample of {len(stats.sample)} kept in memory)")
+        return stats
     
     def get_database_info(self):
         """Get database information"""
@@ -155,3 +179,9 @@ STATISTICAL SUMMARY:
 {df.describe()}
 """
         return info
+    
+    def get_schema_report(self):
+        """Report memory saved and groupby speedup from the declared schema"""
+        if not os.path.exists(self.csv_path):
+            self.generate_database()
+        return schema_report(self.csv_path)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from schema import VALUE_RANGES
+
+DEFAULT_BINS = 512
+
+
+class GroupedHistogram:
+    """Mergeable per-group fixed-width histograms of one numeric column
+
+    Values are counted into `bins` equal bins over a fixed value range,
+    so chunks fold in by adding counts and the cost of a density estimate
+    depends on the number of bins, not rows. The range defaults to the
+    column's entry in schema.VALUE_RANGES; every histogram of a column
+    therefore shares its bins and any two merge. Values outside the range
+    are counted in the first or last bin, so the bin count never grows.
+    Counts are kept per group as (index of the first bin, counts array).
+    """
+
+    def __init__(self, by, column, bins=DEFAULT_BINS, value_range=None):
+        if value_range is None:
+            if column not in VALUE_RANGES:
+                raise ValueError(f"No value range declared for column '{column}'")
+            value_range = VALUE_RANGES[column]
+        self.by = by
+        self.column = column
+        self.bins = bins
+        self.origin = float(value_range[0])
+        self.width = (value_range[1] - value_range[0]) / bins
+        self.counts = {}
+
+    @classmethod
+    def from_frame(cls, df, by, column, bins=DEFAULT_BINS, value_range=None):
+        """Bin df[column] per group of df[by]"""
+        hist = cls(by, column, bins, value_range)
+        hist.update(df)
+        return hist
+
+    def update(self, df):
+        """Fold a chunk of rows into the histograms"""
+        values = df[self.column].to_numpy(dtype='float64')
+        codes, names = pd.factorize(df[self.by])
+        valid = ~np.isnan(values) & (codes >= 0)
+        values, codes = values[valid], codes[valid]
+        if len(values) == 0:
+            return self
+
+        index = np.clip(np.floor((values - self.origin) / self.width), 0, self.bins - 1).astype(np.int64)
+        for code, name in enumerate(names):
+            group = index[codes == code]
+            if len(group):
+                first = group.min()
+                self._add(name, first, np.bincount(group - first))
+        return self
+
+    def _add(self, name, first, counts):
+        if name not in self.counts:
+            self.counts[name] = (first, counts.astype(np.int64))
+            return
+        old_first, old_counts = self.counts[name]
+        start = min(first, old_first)
+        end = max(first + len(counts), old_first + len(old_counts))
+        merged = np.zeros(end - start, dtype=np.int64)
+        merged[old_first - start:old_first - start + len(old_counts)] += old_counts
+        merged[first - start:first - start + len(counts)] += counts
+        self.counts[name] = (start, merged)
+
+    def merge(self, other):
+        """Combine another GroupedHistogram over disjoint rows into this one"""
+        if (other.width, other.origin) != (self.width, self.origin):
+            raise ValueError("Cannot merge histograms with different bins")
+        for name, (first, counts) in other.counts.items():
+            self._add(name, first, counts)
+        return self
+
+    @property
+    def groups(self):
+        return sorted(self.counts)
+
+    def centers(self, name):
+        """Bin centres of a group's histogram"""
+        first, counts = self.counts[name]
+        return self.origin + (first + np.arange(len(counts)) + 0.5) * self.width
+
+    def quantiles(self, name, q):
+        """Quantiles of a group, interpolated linearly within bins"""
+        first, counts = self.counts[name]
+        edges = self.origin + (first + np.arange(len(counts) + 1)) * self.width
+        cumulative = np.concatenate([[0], np.cumsum(counts)]) / counts.sum()
+        return np.interp(q, cumulative, edges)
+
+    def kde(self, name, bw_method='scott', cut=2):
+        """Gaussian KDE of a group by FFT convolution of its binned counts
+
+        Returns (grid, density); the grid extends `cut` bandwidths past the
+        outermost bins and the density integrates to 1. The bandwidth follows
+        Scott's rule (std * n ** -0.2) on the binned data, like seaborn.
+        """
+        _, counts = self.counts[name]
+        centers = self.centers(name)
+        n = counts.sum()
+        mean = np.average(centers, weights=counts)
+        std = np.sqrt(np.average((centers - mean) ** 2, weights=counts))
+        factor = n ** -0.2 if bw_method == 'scott' else float(bw_method)
+        bandwidth = max(std * factor, self.width)
+
+        # Pad the grid by `cut` bandwidths and truncate the kernel at 4 sigma
+        sigma = bandwidth / self.width
+        pad = int(np.ceil(cut * sigma))
+        reach = int(np.ceil(4 * sigma))
+        hist = np.concatenate([np.zeros(pad), counts, np.zeros(pad)])
+        offsets = np.arange(-reach, reach + 1)
+        kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+        kernel /= kernel.sum()
+
+        size = len(hist) + len(kernel) - 1
+        nfft = 1 << (size - 1).bit_length()
+        smoothed = np.fft.irfft(np.fft.rfft(hist, nfft) * np.fft.rfft(kernel, nfft), nfft)
+        density = np.clip(smoothed[reach:reach + len(hist)], 0, None) / (n * self.width)
+        grid = centers[0] + (np.arange(len(hist)) - pad) * self.width
+        return grid, density
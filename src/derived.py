@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from schema import GRADE_LABELS
+
+# Rows evaluated per chunk: every input and output slice of a chunk stays in cache
+DEFAULT_CHUNK_SIZE = 16_384
+
+# ROI_Percent bin edges of each Profitability_Grade, as pd.cut(right=True) bins them
+GRADE_BINS = np.array([-np.inf, -50, 0, 50, 100, 500, np.inf])
+
+# name -> DerivedColumn, in dependency order
+DERIVED = {}
+
+
+class DerivedColumn:
+    """A column computed from others by `compute(out, *inputs)`, writing into `out`"""
+
+    def __init__(self, name, inputs, dtype, compute, categories=None):
+        self.name = name
+        self.inputs = list(inputs)
+        self.dtype = np.dtype(dtype)
+        self.compute = compute
+        # Categorical columns are computed as codes into `categories`
+        self.categories = categories
+
+    def wrap(self, values):
+        """Column values from the computed array"""
+        if self.categories is None:
+            return values
+        return pd.Categorical.from_codes(values, dtype=self.categories)
+
+
+def derived(name, inputs, dtype='float64', categories=None):
+    """Register a derived column; its inputs must be base or already registered columns"""
+    def register(compute):
+        DERIVED[name] = DerivedColumn(name, inputs, dtype, compute, categories)
+        return compute
+    return register
+
+
+@derived('Revenue_Million', ['Copies_Sold_Million', 'Price_USD'])
+def _revenue(out, copies, price):
+    np.multiply(copies, price, out=out)
+
+
+@derived('ROI_Percent', ['Revenue_Million', 'Development_Cost_Million'])
+def _roi(out, revenue, cost):
+    np.subtract(revenue, cost, out=out)
+    out /= cost
+    out *= 100
+
+
+@derived('Engagement_Score', ['Rating', 'Player_Count'])
+def _engagement(out, rating, players):
+    np.multiply(rating, players, out=out)
+    out /= 1000000
+
+
+@derived('Profitability_Grade', ['ROI_Percent'], dtype='int8',
+         categories=pd.CategoricalDtype(GRADE_LABELS, ordered=True))
+def _grade(out, roi):
+    out[:] = np.searchsorted(GRADE_BINS[1:-1], roi, side='left')
+    out[np.isnan(roi) | np.isneginf(roi)] = -1
+
+
+DERIVED_COLUMNS = list(DERIVED)
+
+
+def _plan(names, available):
+    """Derived columns to evaluate for `names`, dependencies first, skipping any without their base columns"""
+    plan = []
+
+    def visit(name):
+        if name in available or name in plan:
+            return True
+        if name not in DERIVED:
+            return False
+        if not all(visit(col) for col in DERIVED[name].inputs):
+            return False
+        plan.append(name)
+        return True
+
+    for name in names:
+        visit(name)
+    return [name for name in DERIVED if name in plan]
+
+
+def evaluate(df, names=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Arrays of derived columns of df, computed in one fused, chunked pass
+
+    Every derived column needed is computed chunk by chunk into its
+    preallocated output, so each chunk of the inputs is read once while
+    it is in cache and no full-size temporary is created. Intermediate
+    columns that were not asked for (e.g. Revenue_Million for
+    Profitability_Grade) only get a chunk-sized scratch buffer.
+    """
+    names = DERIVED_COLUMNS if names is None else [name for name in names if name in DERIVED]
+    plan = _plan(names, set(df.columns))
+    rows = len(df)
+    inputs = {col: df[col].to_numpy() for name in plan for col in DERIVED[name].inputs if col in df.columns}
+    outputs = {name: np.empty(rows, dtype=DERIVED[name].dtype) for name in plan if name in names}
+    scratch = {name: np.empty(min(rows, chunk_size), dtype=DERIVED[name].dtype)
+               for name in plan if name not in outputs}
+
+    for start in range(0, rows, chunk_size):
+        stop = min(start + chunk_size, rows)
+        chunk = {col: values[start:stop] for col, values in inputs.items()}
+        for name in plan:
+            column = DERIVED[name]
+            out = outputs[name][start:stop] if name in outputs else scratch[name][:stop - start]
+            column.compute(out, *(chunk[col] for col in column.inputs))
+            chunk[name] = out
+    return {name: DERIVED[name].wrap(values) for name, values in outputs.items()}
+
+
+def ensure(df, names=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Add the derived columns of `names` (default: all) that df lacks, in place
+
+    Derived columns are never stored; consumers call this when they first
+    need one. Columns whose base columns are missing are skipped.
+    """
+    missing = [name for name in (DERIVED_COLUMNS if names is None else names)
+               if name in DERIVED and name not in df.columns]
+    if missing:
+        for name, values in evaluate(df, missing, chunk_size).items():
+            df[name] = values
+    return df
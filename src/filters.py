@@ -0,0 +1,170 @@
+import hashlib
+import json
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from aggregates import DatasetStats
+
+# Columns with a row-id index, and the FilterSpec clause for each
+FILTER_COLUMNS = {
+    'Genre': 'genres',
+    'Platform': 'platforms',
+    'Publisher': 'publishers',
+    'Release_Year': 'years',
+}
+
+
+def _value_set(values):
+    if values is None:
+        return None
+    return frozenset([values] if isinstance(values, str) else values)
+
+
+class FilterSpec:
+    """Which games the charts include
+
+    `genres`, `platforms` and `publishers` are collections of allowed
+    values; `years` is an inclusive (first, last) range of release years.
+    A clause left as None keeps every row, and clauses combine with AND.
+    """
+
+    def __init__(self, genres=None, platforms=None, publishers=None, years=None):
+        self.genres = _value_set(genres)
+        self.platforms = _value_set(platforms)
+        self.publishers = _value_set(publishers)
+        self.years = tuple(years) if years is not None else None
+
+    def __bool__(self):
+        return any(clause is not None for clause in self.clauses().values())
+
+    def __repr__(self):
+        clauses = ', '.join(f"{FILTER_COLUMNS[column]}={value!r}" for column, value in self.clauses().items()
+                            if value is not None)
+        return f"FilterSpec({clauses})"
+
+    def clauses(self):
+        """Column -> allowed values (or year range), None where unrestricted"""
+        return {column: getattr(self, name) for column, name in FILTER_COLUMNS.items()}
+
+    def key(self):
+        """Canonical text of the filters, for cache keys"""
+        return json.dumps({column: sorted(map(str, value)) if isinstance(value, frozenset) else value
+                           for column, value in self.clauses().items() if value is not None}, sort_keys=True)
+
+    def apply(self, df, index=None):
+        """Rows of df matching the filters; `index` is a FilterIndex of df (default: index_of(df))"""
+        if not self:
+            return df
+        rows = (index or index_of(df)).select(self)
+        filtered = df.take(rows)
+        # A filtered view of a known dataset gets its own identity
+        base = df.attrs.get('fingerprint')
+        filtered.attrs = {}
+        if base:
+            filtered.attrs['fingerprint'] = hashlib.blake2b(f"{base}|{self.key()}".encode('utf-8'),
+                                                            digest_size=16).hexdigest()
+        return filtered
+
+
+class FilterIndex:
+    """Per-value row-id indexes of the FILTER_COLUMNS, built once per frame
+
+    Row ids of each column are stored grouped by value (one sorted array
+    plus offsets per value), so the rows of any set of values are a few
+    slices. A filter materializes only the row ids of its most selective
+    clause, then keeps those whose codes the other clauses allow; the
+    cost follows the matching rows, not the frame, and no column is
+    compared as text.
+    """
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.indexes = {}
+        for column in FILTER_COLUMNS:
+            if column not in df.columns:
+                continue
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, values = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+            valid = codes >= 0
+            order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')]
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(values)))])
+            self.indexes[column] = (pd.Index(values), order, offsets, codes)
+
+    def _positions(self, column, values):
+        positions = self.indexes[column][0].get_indexer(list(values))
+        return positions[positions >= 0]
+
+    def row_ids(self, column, values):
+        """Sorted row positions whose `column` is one of `values`"""
+        _, order, offsets, _ = self.indexes[column]
+        positions = self._positions(column, values)
+        if len(positions) == 0:
+            return np.empty(0, dtype=order.dtype)
+        return np.sort(np.concatenate([order[offsets[p]:offsets[p + 1]] for p in positions]))
+
+    def values_between(self, column, first, last):
+        """Indexed values of `column` within [first, last]"""
+        index = self.indexes[column][0]
+        return index[(index >= first) & (index <= last)]
+
+    def count(self, column, values):
+        """Number of rows whose `column` is one of `values`, from the offsets alone"""
+        offsets = self.indexes[column][2]
+        positions = self._positions(column, values)
+        return int((offsets[positions + 1] - offsets[positions]).sum())
+
+    def select(self, filters):
+        """Row positions matching a FilterSpec"""
+        clauses = []
+        for column, clause in filters.clauses().items():
+            if clause is None:
+                continue
+            if column not in self.indexes:
+                raise KeyError(f"No '{column}' column to filter on")
+            values = clause if isinstance(clause, frozenset) else self.values_between(column, *clause)
+            clauses.append((self.count(column, values), column, values))
+        if not clauses:
+            return np.arange(self.rows)
+
+        clauses.sort(key=lambda clause: clause[0])
+        _, column, values = clauses[0]
+        rows = self.row_ids(column, values)
+        for _, column, values in clauses[1:]:
+            index, _, _, codes = self.indexes[column]
+            # Lookup table over the column's codes; the extra last slot is code -1 (missing)
+            allowed = np.zeros(len(index) + 1, dtype=bool)
+            allowed[self._positions(column, values)] = True
+            rows = rows[allowed[codes[rows]]]
+        return rows
+
+
+# id(frame) -> (weak reference to the frame, its FilterIndex)
+_indexes = {}
+
+
+def index_of(df):
+    """FilterIndex of df, built on first use and kept as long as df is alive"""
+    entry = _indexes.get(id(df))
+    if entry is None or entry[0]() is not df:
+        ref = weakref.ref(df, lambda _, key=id(df): _indexes.pop(key, None))
+        entry = _indexes[id(df)] = (ref, FilterIndex(df))
+    return entry[1]
+
+
+def select(df, stats=None, filters=None):
+    """Rows and grouped statistics a chart draws from, after applying `filters`
+
+    `stats` describes the unfiltered df; filtered statistics are rolled
+    up from its cube.
+    """
+    if filters:
+        df = filters.apply(df)
+        if df.empty:
+            raise ValueError(f"No games match {filters!r}")
+        stats = stats.select(filters, df) if stats else None
+    return df, stats or DatasetStats(df)
@@ -0,0 +1,184 @@
+"""Deterministic, parallel synthetic video game data generator
+
+Rows are produced in fixed-size chunks. Every chunk draws from its own
+random stream spawned from a single SeedSequence, so the output depends
+only on the seed and chunk size - never on how many workers run.
+
+Usage:
+    python src/generator.py --rows 10000000 --workers 8 --output data/big.csv
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+REAL_GAME_NAMES = [
+    'The Legend of Zelda: Breath of the Wild', 'Super Mario Odyssey', 'Mario Kart 8 Deluxe',
+    'Animal Crossing: New Horizons', 'Splatoon 3', 'Elden Ring', 'Baldur\'s Gate 3',
+    'Cyberpunk 2077', 'The Witcher 3', 'Red Dead Redemption 2', 'Grand Theft Auto V',
+    'Minecraft', 'Fortnite', 'Call of Duty: Modern Warfare', 'Valorant',
+    'Counter-Strike 2', 'Dota 2', 'League of Legends', 'Overwatch 2', 'Apex Legends',
+    'Halo Infinite', 'Xbox Game Pass', 'Starfield', 'Palworld', 'Dragon\'s Dogma 2',
+    'Street Fighter 6', 'Final Fantasy XVI', 'Final Fantasy VII Remake', 'Kingdom Hearts III',
+    'Monster Hunter: World', 'Dark Souls 3', 'Bloodborne', 'Sekiro: Shadows Die Twice',
+    'Horizon Zero Dawn', 'God of War Ragnarök', 'Spider-Man 2', 'Ghost of Tsushima',
+    'The Last of Us Part II', 'Uncharted 4', 'Death Stranding', 'Cyberpunk 2077',
+    'Starfield', 'Fallout 4', 'Skyrim', 'Oblivion', 'Morrowind',
+    'Team Fortress 2', 'Portal 2', 'Half-Life 3', 'Left 4 Dead 2', 'Dying Light 2',
+    'Resident Evil 4 Remake', 'Silent Hill 2 Remake', 'Outlast 3', 'Amnesia Collection',
+    'Subnautica', 'No Man\'s Sky', 'Star Citizen', 'Kerbal Space Program', 'Microsoft Flight Sim',
+    'NASCAR Heat 5', 'F1 24', 'Gran Turismo 7', 'Forza Motorsport 8', 'Need for Speed Unbound',
+    'FIFA 24', 'NBA 2K24', 'Madden NFL 24', 'WWE 2K24', 'PGA Tour 2K24',
+    'Tetris Effect', 'Puyo Puyo Tetris', 'Bejeweled 3', 'Candy Crush Saga', 'Portal Knights',
+    'The Sims 4', 'Cities Skylines 2', 'Planet Coaster 2', 'Two Point Hospital', 'Farming Simulator 23',
+    'Deus Ex: Mankind Divided', 'Splinter Cell Remake', 'Hitman 3', 'Dishonored 2', 'Prey',
+    'Outer Wilds', 'A Short Hike', 'Unpacking', 'Return of the Obra Dinn', 'Gris',
+    'Hollow Knight', 'Dead Cells', 'Risk of Rain 2', 'Hades', 'Celeste',
+    'Cuphead', 'Spiritfarer', 'Disco Elysium', 'Persona 5 Royal', 'Fire Emblem: Three Houses',
+    'Diablo IV', 'Path of Exile 2', 'Lost Ark', 'World of Warcraft', 'Final Fantasy XIV',
+    'Elder Scrolls Online', 'Guild Wars 2', 'New World', 'Albion Online', 'RuneScape 3',
+    'Pokémon Scarlet & Violet', 'Pokémon Legends Arceus', 'Pokémon Sword & Shield', 'Pokémon Legends Legends',
+    'Metroid Prime Remastered', 'Metroid Dread', 'Castlevania: Nocturne', 'Mega Man 11', 'Contra: Operation Galuga',
+    'Starcraft II', 'Total War: Warhammer III', 'Age of Empires IV', 'Company of Heroes 3', 'They Are Billions',
+    'XCOM 2', 'Civilization VI', 'Crusader Kings III', 'Stellaris', 'Europa Universalis IV',
+    'Warcraft III Reforged', 'Command & Conquer Remastered', 'Red Alert 4', 'Tiberium Alliances', 'Act of War',
+    'Death\'s Door', 'Salt and Sanctuary', 'Blasphemous', 'Limbo', 'Inside',
+    'Journey', 'Abzu', 'Flower', 'Kena: Bridge of Spirits', 'A Plague Tale',
+    'Heavy Rain', 'Detroit: Become Human', 'Quantum Break', 'Alan Wake', 'Control',
+    'Psychonauts 2', 'Ghostrunner', 'Slime Rancher', 'Grounded', 'No Man\'s Sky',
+    'Stardew Valley', 'Slime Rancher 2', 'Core Keeper', 'Roots of Pacha', 'Everspace 2',
+    'Star Wars Jedi: Survivor', 'Star Wars Jedi: Fallen Order', 'Star Wars Battlefront 2', 'Star Wars: The Old Republic',
+    'Warhammer 40K Darktide', 'Warhammer Vermintide 2', 'Warhammer 40K Space Marine 2', 'Warhammer Age of Sigmar',
+    'Back 4 Blood', 'Killing Floor 2', 'Deep Rock Galactic', 'Helldivers 2', 'Gunfire Reborn',
+    'Sea of Thieves', 'Skull and Bones', 'Pirate101', 'Naval Action', 'Windbound',
+    'It Takes Two', 'A Way Out', 'Overcooked 2', 'Moving Out', 'Unravel 2',
+    'Jackbox Party Packs', 'Among Us', 'Fall Guys', 'Stumble Guys', 'Gartic Phone',
+    'VRChat', 'Beat Saber', 'Half-Life Alyx', 'The Lab', 'Pavlov VR',
+    'Silent Hill Village', 'Resident Evil 8', 'Evil Within 2', 'Alibi', 'Phasmophobia',
+    'Inscryption', 'Slay the Spire', 'Monster Train', 'Hades II', 'Peglin',
+    'Vampire Survivors', 'Magic Survival', 'Brotato', 'Halls of Torment', 'Eatventure',
+    'Hi-Fi Rush', 'Crypt of the NecroDancer', 'Audica', 'Frets on Fire', 'Guitar Hero Live',
+    'Rock Band 4', 'Just Dance 2024', 'Dance Central', 'Zumba Fitness', 'Ring Fit Adventure',
+    'Switch Sports', 'Wii Sports Resort', 'Kinect Sports', 'PlayStation Move Sports', 'VR Sports',
+    'Lies of P', 'Homunculus', 'Salt and Sacrifice', 'Furi', 'Crosscode',
+    'ULTRAKILL', 'Dusk', 'Project Warlock', 'Ion Maiden', 'Prodeus',
+    'Retro City Rampage', 'Hotline Miami', 'Papers Please', 'Return of the Obra Dinn', 'Outer Wilds',
+    'Noita', 'Spelunky 2', 'Caveblazers', 'Juiced 2', 'OutRun 2',
+    'Burnout Revenge', 'Burnout Paradise', 'Split Second', 'Motorstorm', 'Wipeout HD',
+    'F-Zero GX', 'Ridge Racer', 'Initial D Arcade Stage', 'Daytona USA', 'Cruisin Exotica',
+    'Transformers: Fall of Cybertron', 'LEGO Video Games Series', 'Marvel Spider-Man', 'DC Batman Series',
+    'Sonic Adventure 2', 'Shadow the Hedgehog', 'Sonic Generations', 'Sonic Frontiers', 'Sonic Mania'
+]
+
+GENRES = ['Action', 'RPG', 'Strategy', 'Sports', 'Shooter', 'Adventure',
+          'Racing', 'Puzzle', 'Simulation', 'Indie', 'Horror', 'Fighting']
+PLATFORMS = ['PS5', 'Xbox Series X', 'Nintendo Switch', 'PC', 'PS4',
+             'Xbox One', 'Mobile', 'VR', 'Steam Deck']
+PUBLISHERS = ['Sony', 'Microsoft', 'Nintendo', 'Activision Blizzard',
+              'EA Sports', 'Ubisoft', 'Take-Two', 'Rockstar Games',
+              'Bethesda', 'Epic Games', 'Square Enix', 'Capcom', 'Bandai Namco',
+              'Konami', 'Sega', 'CD Projekt Red', 'FromSoftware', 'Fromsoftware Bandai']
+
+GAME_NAMES = np.array(REAL_GAME_NAMES)
+
+
+def generate_chunk(start, size, seed_seq):
+    """Generate rows start+1 .. start+size from their own random stream"""
+    rng = np.random.default_rng(seed_seq)
+    
+    data = {
+        'Game_ID': np.arange(start + 1, start + size + 1),
+        'Game_Name': GAME_NAMES[rng.integers(0, len(GAME_NAMES), size)],
+        'Genre': rng.choice(GENRES, size),
+        'Platform': rng.choice(PLATFORMS, size),
+        'Publisher': rng.choice(PUBLISHERS, size),
+        'Release_Year': rng.integers(2010, 2025, size),
+        'Price_USD': rng.uniform(5, 70, size),
+        'Sales_Million': rng.exponential(5, size) + 0.5,
+        'Player_Count': rng.integers(1000, 50000000, size),
+        'Rating': rng.uniform(1, 10, size),
+        'Development_Cost_Million': rng.uniform(1, 300, size),
+        'Playtime_Hours': rng.uniform(2, 200, size),
+        'Metacritic_Score': rng.uniform(20, 98, size),
+        'Copies_Sold_Million': rng.exponential(3, size) + 0.1,
+        'Budget_Million': rng.uniform(5, 250, size),
+    }
+    
+    # Derived columns (derived.py) are computed when needed, never stored
+    return pd.DataFrame(data)
+
+
+def _generate_csv_chunk(start, size, seed_seq):
+    # Formatting CSV text is the expensive part, so workers do it too
+    return generate_chunk(start, size, seed_seq).to_csv(index=False, header=(start == 0))
+
+
+def _chunk_plan(num_games, seed, chunk_size):
+    starts = list(range(0, num_games, chunk_size))
+    sizes = [min(chunk_size, num_games - start) for start in starts]
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(starts))
+    return starts, sizes, seed_seqs
+
+
+def _run_chunks(func, num_games, seed, chunk_size, workers):
+    """Yield chunk results in order, keeping at most 2 x workers chunks in flight"""
+    starts, sizes, seed_seqs = _chunk_plan(num_games, seed, chunk_size)
+    if workers == 1 or len(starts) <= 1:
+        for args in zip(starts, sizes, seed_seqs):
+            yield func(*args)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = 2 * (workers or os.cpu_count() or 1)
+        pending = []
+        for args in zip(starts, sizes, seed_seqs):
+            pending.append(executor.submit(func, *args))
+            if len(pending) >= window:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def generate_frame(num_games, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """Generate the dataset in memory"""
+    chunks = list(_run_chunks(generate_chunk, num_games, seed, chunk_size, workers))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def generate_csv(path, num_games, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """Generate the dataset straight to a CSV file without holding it in memory"""
+    # Per-process temporary file: several processes may generate the same path
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for text in _run_chunks(_generate_csv_chunk, num_games, seed, chunk_size, workers):
+            f.write(text)
+    os.replace(tmp_path, path)
+    return num_games
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic video game dataset")
+    parser.add_argument('--rows', type=int, default=1000, help="number of games to generate")
+    parser.add_argument('--output', default=os.path.join('data', 'video_games.csv'), help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per chunk (part of the output's identity, unlike --workers)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    
+    start = time.perf_counter()
+    generate_csv(args.output, args.rows, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.rows:,} games in {elapsed:.1f}s -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
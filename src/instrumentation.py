@@ -0,0 +1,142 @@
+"""Wall time, CPU time and call counts per pipeline stage and per chart
+
+Instrumentation is off by default and costs one flag check per stage when
+off. Turn it on with the ANALYTICS_PROFILE environment variable (any value
+but '' or '0') or `enable()`; set ANALYTICS_PROFILE_DIR (or pass
+`profile_dir`) to also dump a cProfile/pstats file per chart. Both are
+inherited by worker processes.
+
+Stages recorded by the dashboard:
+    load_database  reading the dataset (outside any chart)
+    aggregate      grouped-statistics scan, inside the chart that needed it
+    build          the chart function
+    layout         title and tight_layout
+    savefig        encoding and writing the file
+"""
+
+import cProfile
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+ENV_VAR = 'ANALYTICS_PROFILE'
+PROFILE_DIR_ENV_VAR = 'ANALYTICS_PROFILE_DIR'
+
+# Stages in pipeline order, for reports
+STAGES = ['load_database', 'aggregate', 'build', 'layout', 'savefig']
+
+_enabled = os.environ.get(ENV_VAR, '') not in ('', '0')
+_profile_dir = os.environ.get(PROFILE_DIR_ENV_VAR) or None
+
+# (chart number or None, stage) -> [calls, wall seconds, cpu seconds]
+_records = {}
+_current_chart = None
+_active = set()
+
+
+def enable(profile_dir=None):
+    """Start recording, in this process and in worker processes started later"""
+    global _enabled, _profile_dir
+    _enabled = True
+    os.environ[ENV_VAR] = '1'
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        _profile_dir = os.path.abspath(profile_dir)
+        os.environ[PROFILE_DIR_ENV_VAR] = _profile_dir
+
+
+def disable():
+    """Stop recording; collected records are kept until reset()"""
+    global _enabled, _profile_dir
+    _enabled = False
+    _profile_dir = None
+    os.environ.pop(ENV_VAR, None)
+    os.environ.pop(PROFILE_DIR_ENV_VAR, None)
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget all collected records"""
+    _records.clear()
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one call of `name`, attributed to the chart being drawn"""
+    key = (_current_chart, name)
+    # Nested entries of the same stage (e.g. load_database via generate_database) count once
+    if not _enabled or key in _active:
+        yield
+        return
+    _active.add(key)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        record = _records.setdefault(key, [0, 0.0, 0.0])
+        record[0] += 1
+        record[1] += time.perf_counter() - wall
+        record[2] += time.process_time() - cpu
+        _active.discard(key)
+
+
+def instrumented(name):
+    """Decorator form of stage()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def chart(chart_number):
+    """Attribute stages to a chart, profiling it with cProfile if a profile dir is set"""
+    global _current_chart
+    previous, _current_chart = _current_chart, chart_number
+    profiler = cProfile.Profile() if _enabled and _profile_dir else None
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(_profile_dir, f"chart_{chart_number}.pstats"))
+        _current_chart = previous
+
+
+def snapshot():
+    """Collected records as a list of dicts (picklable, for worker results)"""
+    return [{'chart': chart_number, 'stage': name, 'calls': calls, 'wall': wall, 'cpu': cpu}
+            for (chart_number, name), (calls, wall, cpu) in _records.items()]
+
+
+def merge(records):
+    """Add records from snapshot() (e.g. of a worker process) to this process"""
+    for r in records or []:
+        record = _records.setdefault((r['chart'], r['stage']), [0, 0.0, 0.0])
+        record[0] += r['calls']
+        record[1] += r['wall']
+        record[2] += r['cpu']
+
+
+def format_report(records=None):
+    """Per-chart, per-stage timings as a printable table"""
+    records = snapshot() if records is None else records
+    order = {name: i for i, name in enumerate(STAGES)}
+    records = sorted(records, key=lambda r: (r['chart'] or 0, order.get(r['stage'], len(STAGES)), r['stage']))
+
+    lines = [f"{'Chart':<8} {'Stage':<15} {'Calls':>6} {'Wall':>9} {'CPU':>9}", "-" * 51]
+    for r in records:
+        label = '-' if r['chart'] is None else str(r['chart'])
+        lines.append(f"{label:<8} {r['stage']:<15} {r['calls']:>6} {r['wall']:>8.3f}s {r['cpu']:>8.3f}s")
+    if _profile_dir:
+        lines.append(f"cProfile dumps: {_profile_dir}")
+    return "\n".join(lines)
@@ -1,34 +1,94 @@
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for Linux/WSL
-import matplotlib.pyplot as plt
 import sys
 import os
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentation
+from batch import init_worker, render_in_worker
+from charts import CHARTS
+from render import OUTPUT_DIR, cached_chart, render_chart
+
+
+def close_all_figures():
+    """Close open figures, without importing matplotlib if nothing was drawn"""
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close('all')
+
 
 class InteractiveInterface:
-    """Interactive menu-based interface for navigating charts"""
+    """Interactive menu-based interface for navigating charts
     
-    def __init__(self, chart_generator, total_charts=10):
+    While the menu waits for input, charts that are not yet in the render
+    cache are pre-rendered by background worker processes, so selecting
+    one usually just serves the finished file.
+    """
+    
+    def __init__(self, chart_generator, total_charts=10, data_source=None, prerender_workers=None,
+                 output_dir=OUTPUT_DIR):
         self.chart_generator = chart_generator
         self.total_charts = total_charts
+        self.output_dir = output_dir
+        # Data directory for the workers to load; the generator itself is sent otherwise
+        self.data_source = data_source or chart_generator
+        self.prerender_workers = prerender_workers
+        self.executor = None
+        self.prerender_jobs = {}
         
         self.chart_methods = [
-            ('Sales by Genre (Bar Chart)', self.chart_generator.chart_1_sales_by_genre_bar),
-            ('Sales Trend Over Years (Line Chart)', self.chart_generator.chart_2_sales_trend_line),
-            ('Market Share by Platform (Pie Chart)', self.chart_generator.chart_3_market_share_pie),
-            ('Price vs Rating (Scatter Plot)', self.chart_generator.chart_4_price_vs_rating_scatter),
-            ('Rating Distribution (Histogram)', self.chart_generator.chart_5_rating_distribution_histogram),
-            ('Correlation Matrix (Heatmap)', self.chart_generator.chart_6_correlation_heatmap),
-            ('ROI by Publisher (Box Plot)', self.chart_generator.chart_7_roi_by_publisher_box),
-            ('Playtime by Genre (Violin Plot)', self.chart_generator.chart_8_playtime_by_genre_violin),
-            ('Revenue Over Years (Area Chart)', self.chart_generator.chart_9_stacked_revenue_area),
-            ('Player Count vs Sales (Bubble Chart)', self.chart_generator.chart_10_player_count_power_bubble)
+            (name, getattr(self.chart_generator, method_name))
+            for name, method_name in CHARTS
         ]
     
+    def start_prerender(self):
+        """Queue every chart missing from the render cache on background workers"""
+        if self.executor is not None or self.prerender_workers == 0:
+            return
+        
+        fingerprint = self.chart_generator.fingerprint
+        missing = [n for n in range(1, self.total_charts + 1)
+                   if not cached_chart(fingerprint, n, self.output_dir)]
+        if not missing:
+            return
+        
+        workers = self.prerender_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.executor = ProcessPoolExecutor(max_workers=min(workers, len(missing)),
+                                            initializer=init_worker, initargs=(self.data_source,))
+        for chart_number in missing:
+            self.prerender_jobs[chart_number] = self.executor.submit(
+                render_in_worker, chart_number, self.output_dir, 300, 'png', None)
+    
+    def stop_prerender(self):
+        """Cancel queued renders and wait for the ones already running"""
+        if self.executor is None:
+            return
+        if any(job.running() for job in self.prerender_jobs.values()):
+            print("Stopping background rendering...")
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for job in self.prerender_jobs.values():
+            if not job.cancelled() and job.exception() is None:
+                instrumentation.merge(job.result().stages)
+        self.executor = None
+        self.prerender_jobs = {}
+    
+    def chart_status(self, chart_number):
+        """Pre-render status of a chart for the menu"""
+        job = self.prerender_jobs.get(chart_number)
+        if job is None or (job.done() and not job.cancelled() and job.exception() is None
+                           and not job.result().error):
+            return 'ready'
+        if job.running():
+            return 'rendering'
+        if job.done():
+            # A cancelled job may since have been rendered in the foreground
+            if cached_chart(self.chart_generator.fingerprint, chart_number, self.output_dir):
+                return 'ready'
+            return 'not rendered'
+        return 'queued'
+    
     def display_menu(self):
         """Display main menu"""
         while True:
-            plt.close('all')
+            close_all_figures()
             print("\n" + "="*80)
             print("VIDEO GAME ANALYTICS DASHBOARD - CHART MENU")
             print("="*80)
@@ -36,7 +96,8 @@ class InteractiveInterface:
             print("-" * 80)
             
             for i, (name, _) in enumerate(self.chart_methods, 1):
-                print(f"  {i}. {name}")
+                label = f"{i}. {name}"
+                print(f"  {label:<48} [{self.chart_status(i)}]")
             
             print("-" * 80)
             print(f"  0. EXIT")
@@ -47,7 +108,7 @@ class InteractiveInterface:
                 
                 if choice == '0':
                     print("\nThank you for using the Analytics Dashboard!")
-                    plt.close('all')
+                    close_all_figures()
                     break
                 
                 chart_num = int(choice)
@@ -69,37 +130,32 @@ class InteractiveInterface:
                     break
             except KeyboardInterrupt:
                 print("\n\nExiting...")
-                plt.close('all')
+                close_all_figures()
                 break
             except EOFError:
                 print("\n\nEnd of input detected. Exiting...")
-                plt.close('all')
+                close_all_figures()
                 break
     
     def display_chart(self, chart_index):
         """Display selected chart and save as PNG"""
-        chart_name, chart_method = self.chart_methods[chart_index]
+        chart_name, _ = self.chart_methods[chart_index]
         
         print(f"\nLoading: {chart_name}...")
         
         try:
-            # Create output directory if it doesn't exist
-            output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'output')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Generate chart
-            fig = chart_method()
-            
-            # Improve figure appearance
-            fig.suptitle('ANALYTICS DASHBOARD', fontsize=16, fontweight='bold', y=0.98)
+            # Wait for a chart already rendering in the background; a queued
+            # one is cancelled and rendered right here instead
+            job = self.prerender_jobs.get(chart_index + 1)
+            if job is not None and not job.cancel():
+                job.exception()
             
-            plt.tight_layout()
-            
-            # Save chart as PNG
-            filename = f"chart_{chart_index + 1}.png"
-            filepath = os.path.join(output_dir, filename)
-            plt.savefig(filepath, dpi=300, bbox_inches='tight', facecolor='white')
-            print(f"✓ Chart saved: {filepath}")
+            filepath = cached_chart(self.chart_generator.fingerprint, chart_index + 1, self.output_dir)
+            if filepath:
+                print(f"✓ Chart ready: {filepath}")
+            else:
+                filepath = render_chart(self.chart_generator, chart_index + 1, self.output_dir)
+                print(f"✓ Chart saved: {filepath}")
             
             # Try to open with default image viewer
             try:
@@ -116,8 +172,6 @@ class InteractiveInterface:
             except Exception:
                 print(f"  (View the chart manually at: {filepath})")
             
-            plt.close(fig)
-            
             input("\nPress Enter to return to menu...")
             
         except Exception as e:
@@ -126,4 +180,8 @@ class InteractiveInterface:
     
     def run(self):
         """Run interactive menu"""
-        self.display_menu()
+        self.start_prerender()
+        try:
+            self.display_menu()
+        finally:
+            self.stop_prerender()
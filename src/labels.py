@@ -0,0 +1,83 @@
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+# Most labels a chart draws, however many bars or bubbles it has
+MAX_LABELS = 30
+
+
+def top_k(priority, k=MAX_LABELS):
+    """Indices of the k highest priorities, highest first"""
+    priority = np.asarray(priority, dtype='float64')
+    if len(priority) > k:
+        candidates = np.argpartition(-priority, k - 1)[:k]
+    else:
+        candidates = np.arange(len(priority))
+    return candidates[np.argsort(-priority[candidates], kind='stable')]
+
+
+class LabelLayer(Artist):
+    """A bounded pool of data labels drawn as one artist
+
+    Only the `max_labels` highest-priority points get a label, so the
+    number of text artists stays fixed however many categories a chart
+    has. At draw time labels are placed in priority order and a label is
+    skipped when its anchor is outside the axes or its box overlaps a
+    label already placed.
+    """
+
+    zorder = 3
+
+    def __init__(self, ax, max_labels=MAX_LABELS, cull=True, **text_kw):
+        super().__init__()
+        self.set_clip_on(False)
+        self.cull = cull
+        # Same defaults as Axes.text
+        text_kw = {'verticalalignment': 'baseline', 'horizontalalignment': 'left', **text_kw}
+        self.texts = [Text(0, 0, '', transform=ax.transData, clip_on=False, **text_kw)
+                      for _ in range(max_labels)]
+        self.active = 0
+        ax.add_artist(self)
+        for text in self.texts:
+            text.set_figure(ax.get_figure(root=False))
+            text.axes = ax
+
+    def set_labels(self, x, y, strings, priority=None):
+        """Label the top points by priority (default: y); the rest stay unlabelled"""
+        x, y = np.asarray(x), np.asarray(y)
+        picked = top_k(y if priority is None else priority, len(self.texts))
+        for text, i in zip(self.texts, picked):
+            text.set_position((x[i], y[i]))
+            text.set_text(strings[i])
+        for text in self.texts[len(picked):]:
+            text.set_text('')
+        self.active = len(picked)
+        self.stale = True
+
+    def _placed(self, renderer):
+        """Visible labels in priority order, after culling"""
+        bounds = self.axes.bbox.padded(1)
+        placed, boxes = [], []
+        for text in self.texts[:self.active]:
+            if not text.get_text() or not bounds.contains(*text.get_transform().transform(text.get_position())):
+                continue
+            box = text.get_window_extent(renderer)
+            if self.cull and any(box.overlaps(other) for other in boxes):
+                continue
+            placed.append(text)
+            boxes.append(box)
+        return placed, boxes
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        for text in self._placed(renderer)[0]:
+            text.draw(renderer)
+        self.stale = False
+
+    def get_window_extent(self, renderer=None):
+        if renderer is None:
+            renderer = self.get_figure(root=True)._get_renderer()
+        boxes = self._placed(renderer)[1]
+        return Bbox.union(boxes) if boxes else Bbox.null()
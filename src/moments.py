@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from derived import ensure
+
+# Numeric columns correlated in chart 6
+CORRELATION_COLUMNS = ['Price_USD', 'Sales_Million', 'Player_Count', 'Rating',
+                       'Development_Cost_Million', 'Playtime_Hours', 'Revenue_Million', 'ROI_Percent']
+
+
+class CoMoments:
+    """Mergeable count, means and co-moment matrix of numeric columns
+
+    Each chunk is centred on its own means before its cross products are
+    summed, and partial results are combined with Chan's pairwise update,
+    so chunks, worker partitions and a single pass over the whole frame
+    give the same means, variances and Pearson correlations without the
+    cancellation of a raw sum-of-squares formula. Rows with a missing
+    value in any of the columns are skipped.
+    """
+
+    def __init__(self, columns=CORRELATION_COLUMNS):
+        self.columns = list(columns)
+        self.count = 0
+        self._mean = np.zeros(len(self.columns))
+        self._comoment = np.zeros((len(self.columns), len(self.columns)))
+
+    @classmethod
+    def from_frame(cls, df, columns=CORRELATION_COLUMNS):
+        """Accumulate df in one pass"""
+        return cls(columns).update(df)
+
+    def update(self, df):
+        """Fold a chunk of rows into the accumulator"""
+        values = ensure(df, self.columns)[self.columns].to_numpy(dtype='float64')
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return self
+
+        part = CoMoments(self.columns)
+        part.count = len(values)
+        part._mean = values.mean(axis=0)
+        centered = values - part._mean
+        part._comoment = centered.T @ centered
+        return self.merge(part)
+
+    def merge(self, other):
+        """Combine another accumulator over disjoint rows into this one"""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge moments of different columns")
+        if other.count == 0:
+            return self
+
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._comoment = (self._comoment + other._comoment
+                          + np.outer(delta, delta) * self.count * other.count / count)
+        self._mean = self._mean + delta * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def mean(self):
+        return pd.Series(self._mean, index=self.columns)
+
+    @property
+    def cov(self):
+        """Sample covariance matrix"""
+        return pd.DataFrame(self._comoment / max(self.count - 1, 1), index=self.columns, columns=self.columns)
+
+    @property
+    def var(self):
+        return pd.Series(np.diag(self.cov), index=self.columns)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def corr(self):
+        """Pearson correlation matrix"""
+        scale = np.sqrt(np.diag(self._comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self._comoment / np.outer(scale, scale)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.columns, columns=self.columns)
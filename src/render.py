@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import charts
+import instrumentation
+from charts import CHARTS, CHART_MODULES
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+
+# Bump to invalidate every rendered chart, e.g. after a plotting library upgrade
+RENDER_VERSION = 1
+
+
+def chart_filename(chart_number, fmt='png'):
+    """File name of a rendered chart, e.g. chart_3.png"""
+    return f"chart_{chart_number}.{fmt}"
+
+
+# Modules every chart's output depends on, relative to src/; part of each chart's code digest
+CHART_DEPENDENCIES = [
+    'aggregates.py', 'density.py', 'derived.py', 'filters.py', 'labels.py', 'moments.py',
+    'render.py', 'rollup.py', 'sketch.py', os.path.join('charts', '__init__.py'),
+]
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def _chart_code_digest(chart_number):
+    # Read the source files directly so checking the cache never imports the chart
+    _, method_name = CHARTS[chart_number - 1]
+    filename = CHART_MODULES[method_name].lstrip('.') + '.py'
+    digest = hashlib.blake2b(digest_size=8)
+    for path in [os.path.join(os.path.dirname(charts.__file__), filename)] + [
+            os.path.join(SRC_DIR, name) for name in CHART_DEPENDENCIES]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def render_key(fingerprint, chart_number, dpi=300, fmt='png', figsize=None):
+    """Cache key of a rendered chart: dataset, chart code and render parameters"""
+    params = {
+        'dataset': fingerprint,
+        'chart': chart_number,
+        'code': _chart_code_digest(chart_number),
+        'render': RENDER_VERSION,
+        'dpi': dpi,
+        'format': fmt,
+        'figsize': list(figsize) if figsize else None,
+    }
+    return hashlib.blake2b(json.dumps(params, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _key_path(filepath):
+    directory, filename = os.path.split(filepath)
+    return os.path.join(directory, f".{filename}.key")
+
+
+def cached_chart(fingerprint, chart_number, output_dir=OUTPUT_DIR, dpi=300, fmt='png', figsize=None):
+    """Path of an already rendered chart for the same data and parameters, or None"""
+    if not fingerprint:
+        return None
+    filepath = os.path.join(output_dir, chart_filename(chart_number, fmt))
+    try:
+        with open(_key_path(filepath), 'r', encoding='utf-8') as f:
+            key = f.read().strip()
+    except OSError:
+        return None
+    if key != render_key(fingerprint, chart_number, dpi, fmt, figsize) or not os.path.exists(filepath):
+        return None
+    return filepath
+
+
+def _pyplot():
+    """Import pyplot on first render, with a non-interactive backend"""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for Linux/WSL
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def finish_figure(fig, figsize=None):
+    """Resize, title and lay out a chart figure the way every rendered chart is"""
+    if figsize:
+        fig.set_size_inches(figsize)
+    fig.suptitle('ANALYTICS DASHBOARD', fontsize=16, fontweight='bold', y=0.98)
+    # Lay out from the default margins, so a refreshed figure ends up like a fresh one
+    fig.subplotpars.reset()
+    fig.subplots_adjust()
+    fig.tight_layout()
+    return fig
+
+
+def autoscale_collections(ax, collections):
+    """Rescale ax to the current data of `collections`
+
+    relim() skips collections, so a refreshed chart rebuilds the data
+    limits from them directly.
+    """
+    ax.ignore_existing_data_limits = True
+    for collection in collections:
+        ax.update_datalim(collection.get_datalim(ax.transData).get_points())
+    ax.autoscale_view()
+
+
+def render_chart(chart_generator, chart_number, output_dir=OUTPUT_DIR, dpi=300, fmt='png', figsize=None):
+    """Build, lay out and save one chart (numbered from 1); returns the file path"""
+    _, method_name = CHARTS[chart_number - 1]
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, chart_filename(chart_number, fmt))
+    
+    # Drop the old key first so an interrupted render is never served from cache
+    key_path = _key_path(filepath)
+    if os.path.exists(key_path):
+        os.remove(key_path)
+    
+    plt = _pyplot()
+    with instrumentation.chart(chart_number):
+        with instrumentation.stage('build'):
+            fig = getattr(chart_generator, method_name)()
+        keep = chart_generator.keeps(fig)
+        try:
+            # A kept figure is already laid out, unless its size or data changed
+            laid_out = getattr(fig, 'finished_for', None)
+            if not keep or laid_out is None or laid_out[0] != figsize or laid_out[1] is not chart_generator.stats:
+                with instrumentation.stage('layout'):
+                    finish_figure(fig, figsize)
+                fig.finished_for = (figsize, chart_generator.stats)
+            with instrumentation.stage('savefig'):
+                fig.savefig(filepath, dpi=dpi, bbox_inches='tight', facecolor='white', format=fmt)
+        except BaseException:
+            if keep:
+                chart_generator.close()
+            raise
+        finally:
+            if not keep:
+                plt.close(fig)
+    
+    fingerprint = chart_generator.fingerprint
+    with open(key_path, 'w', encoding='utf-8') as f:
+        f.write(render_key(fingerprint, chart_number, dpi, fmt, figsize))
+    return filepath
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from batch import RenderResult, init_worker, load_generator, prepare_source, render_in_worker
+from render import cached_chart
+
+# Wait times kept for the percentiles in metrics()
+WAIT_SAMPLES = 1000
+
+
+class RenderQueue:
+    """Coalescing render queue in front of a pool of render worker processes
+
+    Requests are keyed by (chart, format, dpi, figsize, dataset
+    fingerprint). A request for a chart already being rendered with the
+    same key joins the in-flight render and gets the same Future, so
+    concurrent viewers cost one render. Charts in the render cache are
+    answered at once. The pool is restarted when a request arrives for
+    a new dataset fingerprint: renders of the old version that have
+    not started are cancelled, and the ones running finish into that
+    version's own directory (chart_dir), never over the new files.
+    With `stream`, each new version's CSV is streamed once here and the
+    workers render from its statistics and sample.
+    """
+
+    def __init__(self, data_dir, output_dir, workers=None, stream=False):
+        self.data_dir = data_dir
+        self.stream = stream
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self._executor_fingerprint = None
+        # Re-entrant: a future that is already done runs its callbacks at once
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._waiting = 0
+        self._counts = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'renders': 0, 'errors': 0, 'cancelled': 0}
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._max_wait = 0.0
+
+    def chart_dir(self, fingerprint, dpi):
+        """Directory of the charts rendered from one dataset version at one resolution
+
+        Each dataset version has its own directory, so a render for one
+        version never overwrites a file being served for another.
+        """
+        return os.path.join(self.output_dir, fingerprint, f'{dpi}dpi')
+
+    def _executor_for(self, fingerprint):
+        if self.executor is None or fingerprint != self._executor_fingerprint:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+            if self.stream:
+                source = load_generator(self.data_dir, stream=True)
+            else:
+                prepare_source(self.data_dir, stats=True)
+                source = self.data_dir
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                                initargs=(source,))
+            self._executor_fingerprint = fingerprint
+        return self.executor
+
+    def submit(self, chart_number, fingerprint, fmt='png', dpi=300, figsize=None):
+        """Future of the RenderResult for a chart, shared with identical in-flight requests"""
+        key = (chart_number, fmt, dpi, tuple(figsize) if figsize else None, fingerprint)
+        output_dir = self.chart_dir(fingerprint, dpi)
+        start = time.perf_counter()
+        with self._lock:
+            self._counts['requests'] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counts['coalesced'] += 1
+            else:
+                filepath = cached_chart(fingerprint, chart_number, output_dir, dpi, fmt, figsize)
+                if filepath:
+                    self._counts['cache_hits'] += 1
+                    self._record_wait(time.perf_counter() - start)
+                    future = Future()
+                    future.set_result(RenderResult(chart_number, filepath, 0.0, None, True))
+                    return future
+                self._counts['renders'] += 1
+                future = self._executor_for(fingerprint).submit(
+                    render_in_worker, chart_number, output_dir, dpi, fmt, figsize)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done: self._finished(key, done))
+            self._waiting += 1
+        future.add_done_callback(lambda done: self._answered(start))
+        return future
+
+    def render(self, chart_number, fingerprint, fmt='png', dpi=300, figsize=None):
+        """Block until the chart is rendered (or joined) and return its RenderResult"""
+        return self.submit(chart_number, fingerprint, fmt, dpi, figsize).result()
+
+    async def render_async(self, chart_number, fingerprint, fmt='png', dpi=300, figsize=None):
+        """Await the chart's RenderResult from an asyncio event loop"""
+        return await asyncio.wrap_future(self.submit(chart_number, fingerprint, fmt, dpi, figsize))
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.cancelled():
+                self._counts['cancelled'] += 1
+            elif future.exception() is not None or future.result().error:
+                self._counts['errors'] += 1
+
+    def _answered(self, start):
+        with self._lock:
+            self._waiting -= 1
+            self._record_wait(time.perf_counter() - start)
+
+    def _record_wait(self, seconds):
+        self._waits.append(seconds)
+        self._max_wait = max(self._max_wait, seconds)
+
+    def metrics(self):
+        """Queue depth, request counts and wait times (seconds) as a dict"""
+        with self._lock:
+            waits = sorted(self._waits)
+            metrics = dict(self._counts, in_flight=len(self._inflight), waiting=self._waiting)
+            metrics['wait_max'] = self._max_wait
+        metrics['wait_mean'] = sum(waits) / len(waits) if waits else 0.0
+        metrics['wait_p50'] = waits[len(waits) // 2] if waits else 0.0
+        metrics['wait_p95'] = waits[int(len(waits) * 0.95)] if waits else 0.0
+        return metrics
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool, cancelling renders that have not started"""
+        with self._lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,49 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Label of the bucket holding every group outside the top N
+OTHER = 'Other'
+
+
+def top_n(values, n):
+    """The n largest values of a Series, largest first
+
+    Uses partial selection (np.argpartition), so only the n kept values
+    are sorted, not every group.
+    """
+    if len(values) > n:
+        values = values.iloc[np.argpartition(-values.to_numpy(dtype='float64'), n - 1)[:n]]
+    return values.sort_values(ascending=False, kind='stable')
+
+
+def top_n_other(values, n, other=OTHER):
+    """Top n values of an additive metric, plus one `other` entry summing the rest"""
+    top = top_n(values, n)
+    if len(values) > len(top):
+        rest = values[~values.index.isin(top.index)]
+        top = pd.concat([top, pd.Series([rest.sum()], index=pd.Index([other], name=values.index.name))])
+    return top
+
+
+def lump(stats, keep, level=None, other=OTHER):
+    """GroupedStats with every group outside `keep` merged into one `other` group
+
+    With a multi-key grouping, only the `level` key is lumped (e.g. genres
+    in year x genre) and the other keys are kept.
+    """
+    index = stats.size.index
+    if level is None:
+        labels = pd.Index(index.where(index.isin(keep), other), name=index.name)
+    else:
+        keys = index.to_frame(index=False)
+        keys[level] = keys[level].where(keys[level].isin(keep), other)
+        labels = pd.MultiIndex.from_frame(keys)
+
+    relabelled = copy.copy(stats)
+    for name in ('size', 'count', 'mean', 'm2', 'min', 'max'):
+        frame = getattr(stats, name).copy()
+        frame.index = labels
+        setattr(relabelled, name, frame)
+    return relabelled.rollup(list(index.names))
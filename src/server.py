@@ -0,0 +1,204 @@
+"""Serve the dashboard charts over HTTP on the local network
+
+Usage:
+    python src/server.py --data-dir data --port 8050
+"""
+import argparse
+import email.utils
+import json
+import os
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from batch import prepare_source
+from charts import CHARTS
+from database import VideoGameDatabase
+from render import OUTPUT_DIR, render_key
+from render_queue import RenderQueue
+
+DEFAULT_PORT = 8050
+# Screen resolution; ?dpi= asks for another one within DPI_RANGE
+DEFAULT_DPI = 100
+DPI_RANGE = (30, 300)
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+CHART_PATH = re.compile(r'/charts/(\d+)\.(png|svg)')
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """HTTP server rendering charts on a pool of worker processes
+
+    Renders go through a RenderQueue, so simultaneous requests for the
+    same chart share one render. Results are kept in the render cache
+    under output_dir, one directory per dataset fingerprint and
+    resolution. Every response
+    carries an ETag (the render key: dataset fingerprint, chart code and
+    parameters) and the dataset's Last-Modified time, so browsers
+    revalidate with a cheap 304 instead of downloading the chart again.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, data_dir='data', output_dir=None, workers=None, dpi=DEFAULT_DPI, quiet=False,
+                 stream=False):
+        super().__init__(address, ChartRequestHandler)
+        self.db = VideoGameDatabase(data_dir)
+        self.queue = RenderQueue(data_dir, output_dir or os.path.join(OUTPUT_DIR, 'web'), workers, stream)
+        self.dpi = dpi
+        self.quiet = quiet
+        self.stream = stream
+        # ((size, mtime_ns) of the CSV, its fingerprint)
+        self._version = None
+
+        # Generate the dataset and its columnar cache if needed, so fingerprints are cheap
+        prepare_source(data_dir, stream=stream)
+
+    def dataset_version(self):
+        """Fingerprint and modification time of the current dataset (streamed, with `stream`)
+
+        The fingerprint is only computed again when the CSV's size or
+        modification time changes, so requests never rehash the file.
+        """
+        stat = os.stat(self.db.csv_path)
+        state = (stat.st_size, stat.st_mtime_ns)
+        version = self._version
+        if version is None or version[0] != state:
+            fingerprint = self.db.stream_fingerprint() if self.stream else self.db.fingerprint()
+            version = self._version = (state, fingerprint)
+        return version[1], stat.st_mtime
+
+    def chart_file(self, chart_number, fmt, dpi, fingerprint):
+        """Path of the rendered chart, rendering it if not cached; raises on render errors"""
+        result = self.queue.render(chart_number, fingerprint, fmt, dpi)
+        if result.error:
+            raise RuntimeError(result.error)
+        return result.filepath
+
+    def server_close(self):
+        super().server_close()
+        self.queue.shutdown()
+
+
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    """GET / for an index page, /charts/N.png or /charts/N.svg for a chart, /metrics for queue metrics"""
+
+    server_version = 'AnalyticsDashboard/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in ('/', '/index.html'):
+            self._send(200, 'text/html; charset=utf-8', index_page().encode('utf-8'))
+            return
+        if url.path == '/metrics':
+            self._send(200, 'application/json', json.dumps(self.server.queue.metrics()).encode('utf-8'))
+            return
+
+        match = CHART_PATH.fullmatch(url.path)
+        if not match or not 1 <= int(match.group(1)) <= len(CHARTS):
+            self.send_error(404, "Unknown chart")
+            return
+        chart_number, fmt = int(match.group(1)), match.group(2)
+        try:
+            dpi = int(parse_qs(url.query).get('dpi', [self.server.dpi])[0])
+        except ValueError:
+            dpi = None
+        if dpi is None or not DPI_RANGE[0] <= dpi <= DPI_RANGE[1]:
+            self.send_error(400, f"dpi must be between {DPI_RANGE[0]} and {DPI_RANGE[1]}")
+            return
+
+        fingerprint, modified = self.server.dataset_version()
+        headers = {
+            'ETag': f'"{render_key(fingerprint, chart_number, dpi, fmt)}"',
+            'Last-Modified': email.utils.formatdate(modified, usegmt=True),
+            'Cache-Control': 'no-cache',  # always revalidate, usually with a 304
+        }
+        if self._not_modified(headers['ETag'], modified):
+            self._send(304, None, b'', headers)
+            return
+
+        try:
+            filepath = self.server.chart_file(chart_number, fmt, dpi, fingerprint)
+        except Exception as e:
+            self.send_error(500, f"Chart {chart_number} failed: {e}")
+            return
+        with open(filepath, 'rb') as f:
+            body = f.read()
+        self._send(200, CONTENT_TYPES[fmt], body, headers)
+
+    def _not_modified(self, etag, modified):
+        """Whether the conditional request headers match the current chart"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return int(modified) <= since.timestamp()
+        return False
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            print(f"{self.address_string()} - {format % args}")
+
+
+def index_page():
+    """HTML page showing every chart"""
+    items = "\n".join(
+        f'<h2>{n}. {name}</h2>\n<a href="/charts/{n}.svg"><img src="/charts/{n}.png" width="960"></a>'
+        for n, (name, _) in enumerate(CHARTS, 1))
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Video Game Analytics Dashboard</title></head>
+<body style="font-family: sans-serif">
+<h1>Video Game Analytics Dashboard</h1>
+{items}
+</body>
+</html>
+"""
+
+
+def serve(data_dir='data', host='127.0.0.1', port=DEFAULT_PORT, workers=None, output_dir=None, stream=False):
+    """Run the dashboard server until interrupted"""
+    server = DashboardServer((host, port), data_dir, output_dir, workers, stream=stream)
+    print(f"Serving the dashboard on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping server...")
+    finally:
+        server.server_close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard charts over HTTP")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--output-dir', default=None, help="render cache directory (default: output/web)")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (0.0.0.0 for the whole network)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="render worker processes (default: all cores)")
+    parser.add_argument('--stream', action='store_true',
+                        help="aggregate the CSV chunk by chunk instead of loading it (files larger than memory)")
+    args = parser.parse_args(argv)
+    return serve(args.data_dir, args.host, args.port, args.workers, args.output_dir, args.stream)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
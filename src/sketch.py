@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 200
+
+
+class KLLSketch:
+    """Mergeable approximate quantiles in bounded memory (KLL sketch)
+
+    Values are kept in a stack of compactors: level h holds items that
+    each stand for 2**h inputs. When the sketch exceeds its capacity the
+    lowest full level is sorted and every other item (from a random
+    offset) is promoted to the next level. Memory stays at O(k log(n/k))
+    items. With k=200 a quantile's rank is within about 1.65% of the
+    true rank (normalized rank error, 99% confidence), the same bound as
+    the reference KLL implementation. Merging sketches of disjoint data
+    gives the same guarantee as sketching all of it. Min and max are
+    exact.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        # Lower levels shrink geometrically (factor 2/3) below the top one
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        while sum(len(items) for items in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, items in enumerate(self.levels) if len(items) >= self._capacity(h))
+            items = np.sort(self.levels[level])
+            # An odd item stays behind so the promoted half is exact
+            keep, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self._rng.integers(2)::2]])
+
+    def update(self, values):
+        """Add values (NaNs are ignored)"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Combine a sketch of disjoint data into this one"""
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _sorted(self):
+        """Retained items in order, with the cumulative weight up to each"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate quantile(s) q in [0, 1]; NaN for an empty sketch"""
+        q = np.asarray(q, dtype='float64')
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        items, cumulative = self._sorted()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.minimum(index, len(items) - 1)]
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if q.ndim else float(result)
+
+    def rank(self, x):
+        """Approximate share of the values below x (scalar or array); NaN for an empty sketch"""
+        x = np.asarray(x, dtype='float64')
+        if self.count == 0:
+            return np.full(x.shape, np.nan) if x.ndim else np.nan
+        items, cumulative = self._sorted()
+        below = np.concatenate([[0.0], cumulative])[np.searchsorted(items, x, side='left')]
+        result = below / cumulative[-1]
+        return result if x.ndim else float(result)
+
+
+class GroupedSketch:
+    """KLL sketches of one column, overall and per group of another column"""
+
+    def __init__(self, column, by=None, k=DEFAULT_K):
+        self.column = column
+        self.by = by
+        self.k = k
+        self.overall = KLLSketch(k)
+        self.sketches = {}
+
+    @classmethod
+    def from_frame(cls, df, column, by=None, k=DEFAULT_K):
+        return cls(column, by, k).update(df)
+
+    def update(self, df):
+        """Fold a chunk of rows into the sketches"""
+        values = df[self.column].to_numpy(dtype='float64')
+        self.overall.update(values)
+        if self.by is not None:
+            codes, names = pd.factorize(df[self.by])
+            for code, name in enumerate(names):
+                self.sketches.setdefault(name, KLLSketch(self.k)).update(values[codes == code])
+        return self
+
+    def merge(self, other):
+        """Combine sketches of disjoint rows into these"""
+        self.overall.merge(other.overall)
+        for name, sketch in other.sketches.items():
+            self.sketches.setdefault(name, KLLSketch(self.k)).merge(sketch)
+        return self
+
+    @property
+    def groups(self):
+        return sorted(self.sketches)
+
+    def sketch(self, group=None):
+        return self.overall if group is None else self.sketches[group]
+
+    def quantile(self, q, group=None):
+        """Approximate quantile(s) of the column, overall or within one group"""
+        return self.sketch(group).quantile(q)
@@ -0,0 +1,119 @@
+"""Measure dashboard startup time: imports, data loading and pre-rendering until the menu
+
+Runs `run.py`'s imports in a fresh interpreter with `-X importtime`, then
+goes through the same steps as `run.py` before the menu appears (loading
+the database and its statistics, starting the pre-render workers), and
+reports the slowest modules against a time-to-menu budget.
+
+Usage:
+    python src/startup.py --data-dir data --budget 1.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds from interpreter start to the menu that `--budget` checks by default
+DEFAULT_BUDGET = 1.5
+
+# Run in the child interpreter: everything run.py does before showing the menu
+_PROBE = """
+import contextlib, io, json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import run
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    db = run.VideoGameDatabase({data_dir!r}, mmap=True)
+    df = db.load_database()
+    loaded = time.perf_counter()
+    dataset_stats = db.load_stats(df)
+    dataset_stats.overall
+    chart_gen = run.ChartGenerator(df, stats=dataset_stats)
+    stats = time.perf_counter()
+    interface = run.InteractiveInterface(chart_gen, total_charts=10, data_source={data_dir!r},
+                                         output_dir={output_dir!r} or run.OUTPUT_DIR)
+    interface.start_prerender()
+    menu = time.perf_counter()
+    heavy = [m for m in ('numpy', 'pandas', 'matplotlib', 'seaborn') if m in sys.modules]
+    interface.stop_prerender()
+print(json.dumps({{'imports': imported - start, 'load': loaded - imported, 'stats': stats - loaded,
+                  'prerender': menu - stats, 'modules': heavy}}))
+"""
+
+
+def parse_importtime(text):
+    """Parse `-X importtime` output into {module: (self_seconds, cumulative_seconds)}"""
+    times = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return times
+
+
+def measure_startup(data_dir='data', output_dir=None):
+    """Time everything run.py does before the menu, in a fresh interpreter
+
+    Returns a dict with 'imports', 'load', 'stats' and 'prerender' seconds,
+    their sum as 'total', the heavy libraries loaded by the time the menu
+    appears ('modules'), and per-module import times ('import_times').
+    Charts are pre-rendered into `output_dir` (default: the dashboard's).
+    """
+    probe = _PROBE.format(root=ROOT_DIR, data_dir=os.path.abspath(data_dir),
+                          output_dir=output_dir and os.path.abspath(output_dir))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['total'] = report['imports'] + report['load'] + report['stats'] + report['prerender']
+    report['import_times'] = parse_importtime(result.stderr)
+    return report
+
+
+def format_report(report, budget=None, top=10):
+    """Startup timings and the slowest top-level imports as a printable table"""
+    lines = [f"{'Stage':<45} {'Time':>8}", "-" * 54]
+    lines.append(f"{'Imports':<45} {report['imports']:>7.2f}s")
+    lines.append(f"{'Load database':<45} {report['load']:>7.2f}s")
+    lines.append(f"{'Load statistics':<45} {report['stats']:>7.2f}s")
+    lines.append(f"{'Start pre-rendering':<45} {report['prerender']:>7.2f}s")
+    lines.append(f"{'Time to menu':<45} {report['total']:>7.2f}s")
+    if budget is not None:
+        status = "within budget" if report['total'] <= budget else "OVER BUDGET"
+        lines.append(f"{'Budget':<45} {budget:>7.2f}s  {status}")
+    lines.append(f"Heavy libraries loaded: {', '.join(report['modules']) or 'none'}")
+
+    # Slowest modules by cumulative time, skipping submodules of a listed package
+    lines.append("")
+    lines.append(f"{'Slowest imports (cumulative)':<45} {'Time':>8}")
+    lines.append("-" * 54)
+    ranked = sorted(report['import_times'].items(), key=lambda item: item[1][1], reverse=True)
+    shown = []
+    for name, (_, cumulative) in ranked:
+        if any(name.startswith(parent + '.') for parent in shown):
+            continue
+        shown.append(name)
+        lines.append(f"{name:<45} {cumulative:>7.2f}s")
+        if len(shown) == top:
+            break
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report dashboard startup time")
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="time-to-menu budget in seconds")
+    parser.add_argument('--top', type=int, default=10, help="number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    report = measure_startup(args.data_dir)
+    print(format_report(report, args.budget, args.top))
+    return 0 if report['total'] <= args.budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import DatasetStats
+from schema import read_csv
+
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_SAMPLE_SIZE = 50_000
+
+
+class StreamingAggregator:
+    """Feed CSV chunks into chart aggregations with bounded memory
+
+    Grouped statistics are updated incrementally. A bottom-k sample (the
+    rows with the smallest random keys seen so far) keeps a uniform sample
+    of at most `sample_size` rows for the distribution charts, so peak
+    memory depends on chunk and sample size rather than file size.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, seed=42):
+        self.stats = DatasetStats()
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self._sample = None
+        self._keys = np.empty(0)
+
+    def update(self, chunk):
+        """Fold one chunk into the statistics and the sample"""
+        self.stats.update(chunk)
+
+        keys = np.concatenate([self._keys, self.rng.random(len(chunk))])
+        rows = chunk if self._sample is None else pd.concat([self._sample, chunk], ignore_index=True)
+        if len(rows) > self.sample_size:
+            keep = np.sort(np.argpartition(keys, self.sample_size)[:self.sample_size])
+            rows = rows.iloc[keep].reset_index(drop=True)
+            keys = keys[keep]
+        self._sample, self._keys = rows, keys
+
+    def result(self):
+        """Return the DatasetStats with its sample attached"""
+        self.stats.sample = self._sample
+        return self.stats
+
+
+def iter_chunks(csv_path, chunksize=DEFAULT_CHUNK_SIZE):
+    """Yield typed DataFrame chunks of at most `chunksize` rows"""
+    with read_csv(csv_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def stream_csv(csv_path, chunksize=DEFAULT_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE):
+    """Aggregate a CSV chunk by chunk without loading it into memory"""
+    aggregator = StreamingAggregator(sample_size=sample_size)
+    for chunk in iter_chunks(csv_path, chunksize):
+        aggregator.update(chunk)
+    return aggregator.result()
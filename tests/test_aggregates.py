@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""Test the shared grouped statistics and streamed aggregates"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend
+import matplotlib.pyplot as plt
+import numpy as np
+
+from database import VideoGameDatabase
+from density import GroupedHistogram
+from aggregates import DatasetStats, GroupedStats
+from filters import FilterIndex, FilterSpec, select
+from moments import CORRELATION_COLUMNS, CoMoments
+from rollup import OTHER, lump, top_n, top_n_other
+from sketch import KLLSketch
+from charts import ChartGenerator
+
+db = VideoGameDatabase(os.path.join(os.path.dirname(__file__), '..', 'data'))
+df = db.load_database()
+checks = []
+
+
+def check(name, condition):
+    checks.append(condition)
+    print(f"{'✓' if condition else '✗'} {name}")
+
+
+def frames_close(a, b):
+    a, b = a.sort_index(), b.sort_index()
+    return a.index.equals(b.index) and np.allclose(a.to_numpy(float), b.to_numpy(float), equal_nan=True)
+
+
+in_memory = DatasetStats(df)
+for dim, by in DatasetStats.DIMENSIONS.items():
+    direct = GroupedStats.from_frame(df, by)
+    rolled = in_memory.group(dim)
+    check(f"Rolled-up {dim} stats match a direct groupby",
+          all(frames_close(getattr(direct, attr)[rolled.columns], getattr(rolled, attr))
+              for attr in ['count', 'sum', 'mean', 'std', 'min', 'max']))
+
+streamed = db.stream_database(chunksize=97, sample_size=250)
+
+for dim in DatasetStats.DIMENSIONS:
+    a, b = in_memory.group(dim), streamed.group(dim)
+    check(f"Streamed {dim} stats match in-memory",
+          all(frames_close(getattr(a, attr), getattr(b, attr)[a.columns])
+              for attr in ['count', 'sum', 'mean', 'std', 'min', 'max'])
+          and frames_close(a.size, b.size))
+
+check("Overall stats match pandas", frames_close(
+    in_memory.overall[['Rating', 'Revenue_Million']],
+    df[['Rating', 'Revenue_Million']].agg(['count', 'sum', 'mean', 'std', 'min', 'max'])))
+playtime = df.groupby('Genre', observed=True)['Playtime_Hours']
+check("Streamed playtime histograms count every row",
+      {g: int(streamed.playtime.counts[g][1].sum()) for g in streamed.playtime.groups} == playtime.size().to_dict())
+check("Binned quartiles match exact quartiles to 1% of the range",
+      all(np.allclose(streamed.playtime.quantiles(g, [0.25, 0.5, 0.75]), values.quantile([0.25, 0.5, 0.75]),
+                      atol=0.01 * (values.max() - values.min())) for g, values in playtime))
+grid, density = in_memory.playtime.kde('Action')
+check("Binned KDE integrates to one", abs(np.trapezoid(density, grid) - 1) < 0.01)
+parts = [GroupedHistogram.from_frame(part, 'Genre', 'Playtime_Hours') for part in (df.iloc[600:], df.iloc[:600])]
+whole = GroupedHistogram.from_frame(df, 'Genre', 'Playtime_Hours')
+merged_hist = parts[0].merge(parts[1])
+check("Histograms built separately merge into the whole-frame histogram",
+      all(merged_hist.counts[g][0] == whole.counts[g][0] and (merged_hist.counts[g][1] == whole.counts[g][1]).all()
+          for g in whole.groups))
+merged_hist.update(df.head(3).assign(Playtime_Hours=[-1e6, 1e6, 1e9]))
+check("Values outside the declared range keep the bin count bounded",
+      all(first >= 0 and first + len(counts) <= merged_hist.bins for first, counts in merged_hist.counts.values()))
+halves = CoMoments.from_frame(df.iloc[:400]).merge(CoMoments.from_frame(df.iloc[400:]))
+check("Merged co-moments give pandas' correlations",
+      frames_close(halves.corr, df[CORRELATION_COLUMNS].corr()))
+check("Streamed co-moments give pandas' means and standard deviations",
+      np.allclose(streamed.moments.mean, df[CORRELATION_COLUMNS].mean())
+      and np.allclose(streamed.moments.std, df[CORRELATION_COLUMNS].std()))
+
+
+def rank_error(values, estimate, q):
+    return abs((np.sort(values) <= estimate).mean() - q)
+
+
+ratings = df['Rating'].to_numpy()
+check("Streamed Rating median within the sketch's rank error",
+      rank_error(ratings, streamed.sketch('Rating').quantile(0.5), 0.5) < 0.0165)
+check("Per-genre playtime quartiles within the sketch's rank error",
+      all(rank_error(values, streamed.sketch('Playtime_Hours').quantile(q, genre), q) < 0.0165
+          for genre, values in playtime for q in [0.25, 0.5, 0.75]))
+merged = KLLSketch().update(ratings[:500]).merge(KLLSketch(seed=1).update(ratings[500:]))
+check("Merged sketches keep exact count, min and max",
+      merged.count == len(ratings) and merged.min == ratings.min() and merged.max == ratings.max())
+check("Sketch ranks within the sketch's rank error",
+      all(abs(merged.rank(x) - (ratings < x).mean()) < 0.0165 for x in [5, 7, 9]))
+check("Sample is bounded", len(streamed.sample) == 250 and streamed.rows == len(df))
+
+publisher_sales = DatasetStats(df).publisher.sum['Sales_Million']
+check("top_n matches a full sort",
+      top_n(publisher_sales, 5).equals(publisher_sales.sort_values(ascending=False).head(5)))
+rolled_up = top_n_other(publisher_sales, 5)
+check("Top N plus Other keeps the total",
+      len(rolled_up) == 6 and rolled_up.index[-1] == OTHER and np.isclose(rolled_up.sum(), publisher_sales.sum()))
+stats = DatasetStats(df)
+keep = top_n(stats.genre.sum['Revenue_Million'], 3).index
+lumped_df = df.assign(Genre=df['Genre'].astype(str).where(df['Genre'].isin(keep), OTHER))
+check("Lumped year x genre matches grouping with Other directly",
+      frames_close(GroupedStats.from_frame(lumped_df, ['Release_Year', 'Genre']).mean,
+                   lump(stats.year_genre, keep, level='Genre').mean))
+
+
+def render_all(chart_gen):
+    rendered = 0
+    for name in sorted(n for n in dir(chart_gen) if n.startswith('chart_')):
+        plt.close(getattr(chart_gen, name)())
+        rendered += 1
+    return rendered
+
+
+check("All charts render from streamed aggregates",
+      render_all(ChartGenerator(streamed.sample, stats=streamed)) == 10)
+
+persisted = DatasetStats(df)
+persisted.fingerprint = 'persisted'
+persisted.save(os.path.join(db.data_dir, '.test.stats.pkl'))
+persisted = DatasetStats.load(os.path.join(db.data_dir, '.test.stats.pkl'))
+os.remove(os.path.join(db.data_dir, '.test.stats.pkl'))
+check("All charts render from persisted aggregates without rows",
+      persisted.sample is None and render_all(ChartGenerator(None, stats=persisted)) == 10)
+
+scans = []
+original_fill = GroupedStats._fill
+GroupedStats._fill = lambda self, frame: (scans.append(len(frame)), original_fill(self, frame))[1]
+try:
+    render_all(ChartGenerator(df))
+finally:
+    GroupedStats._fill = original_fill
+check("All ten charts share a single grouped scan", scans == [len(df)])
+
+spec = FilterSpec(genres=['RPG', 'Action'], platforms='PC', years=(2015, 2020))
+expected = df[df['Genre'].isin(['RPG', 'Action']) & (df['Platform'] == 'PC') & df['Release_Year'].between(2015, 2020)]
+check("Row-id index selects the same rows as column comparisons",
+      list(FilterIndex(df).select(spec)) == list(np.flatnonzero(df.index.isin(expected.index)))
+      and list(FilterIndex(df).select(FilterSpec(genres=['RPG', 'Nope'], years=(2030, 2040)))) == [])
+built = []
+original_init = FilterIndex.__init__
+FilterIndex.__init__ = lambda self, frame: (built.append(len(frame)), original_init(self, frame))[1]
+try:
+    for _ in range(3):
+        select(df, filters=spec)
+finally:
+    FilterIndex.__init__ = original_init
+check("Charts called with filters= share one index per frame", built == [len(df)])
+filtered = ChartGenerator(df, filters=FilterSpec(genres='RPG'))
+check("Filtered charts aggregate only the matching games",
+      list(filtered.stats.genre.size.index) == ['RPG'] and filtered.stats.rows == (df['Genre'] == 'RPG').sum()
+      and filtered.fingerprint != ChartGenerator(df).fingerprint)
+check("All charts render with a filter", render_all(filtered) == 10)
+
+cube_stats = DatasetStats(df)
+cube_stats.cube
+scans.clear()
+GroupedStats._fill = lambda self, frame: (scans.append(len(frame)), original_fill(self, frame))[1]
+try:
+    rolled = cube_stats.select(spec, expected)
+    rolled_dims = [rolled.genre, rolled.platform, rolled.publisher, rolled.year_genre]
+finally:
+    GroupedStats._fill = original_fill
+direct = DatasetStats(expected)
+check("Filtered statistics roll up the cube without scanning rows",
+      scans == [] and all(frames_close(getattr(a, attr), getattr(b, attr))
+                          for a, b in zip(rolled_dims, [direct.genre, direct.platform, direct.publisher, direct.year_genre])
+                          for attr in ['count', 'sum', 'std', 'min', 'max']))
+check("Cube keeps sums of squares per cell",
+      frames_close(cube_stats.cube.sumsq['Price_USD'].to_frame(),
+                   (df['Price_USD'] ** 2).groupby([df[c] for c in DatasetStats.BASE_GRAIN], observed=True).sum()
+                   .rename_axis(DatasetStats.BASE_GRAIN).to_frame()))
+try:
+    ChartGenerator(df, filters=FilterSpec(years=(1900, 1901)))
+    check("A filter matching no games is rejected", False)
+except ValueError:
+    check("A filter matching no games is rejected", True)
+
+print(f"\nResults: {sum(checks)}/{len(checks)} checks passed")
+sys.exit(0 if all(checks) else 1)
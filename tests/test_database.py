@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Test database loading, the declared schema and the columnar cache"""
+
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from aggregates import DatasetStats, GroupedStats
+from column_store import ColumnStore
+from database import VideoGameDatabase
+from derived import DERIVED_COLUMNS, ensure, evaluate
+from generator import generate_chunk, generate_csv
+from schema import DTYPES, read_csv
+
+source_csv = os.path.join(os.path.dirname(__file__), '..', 'data', 'video_games.csv')
+work_dir = tempfile.mkdtemp()
+checks = []
+categorical = [col for col, dtype in DTYPES.items() if dtype == 'category']
+
+
+def check(name, condition):
+    checks.append(condition)
+    print(f"{'✓' if condition else '✗'} {name}")
+
+
+def is_mapped(series):
+    base = series.to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    return base is not None
+
+
+try:
+    shutil.copy(source_csv, work_dir)
+    db = VideoGameDatabase(work_dir)
+    csv_df = pd.read_csv(db.csv_path)
+
+    # Declared schema
+    first = db.load_database()
+    check("Categorical columns loaded as category",
+          all(isinstance(first[col].dtype, pd.CategoricalDtype) for col in categorical))
+    check("Numeric columns use declared widths",
+          all(first[col].dtype == DTYPES[col] for col in first.columns if col not in categorical))
+    check("Schema uses less memory than inferred types",
+          first.memory_usage(deep=True).sum() < csv_df.memory_usage(deep=True).sum())
+
+    # Derived columns: computed on demand, never stored
+    check("Loaded frame and CSV carry only base columns",
+          not set(DERIVED_COLUMNS) & (set(first.columns) | set(pd.read_csv(db.csv_path, nrows=0).columns)))
+    rows = generate_chunk(0, 5000, np.random.SeedSequence(3))
+    revenue = rows['Copies_Sold_Million'] * rows['Price_USD']
+    roi = (revenue - rows['Development_Cost_Million']) / rows['Development_Cost_Million'] * 100
+    chunked = evaluate(rows, chunk_size=333)
+    check("Derived columns match their formulas across chunk boundaries",
+          (chunked['ROI_Percent'] == roi.to_numpy()).all()
+          and (chunked['Profitability_Grade'] == pd.cut(roi, [-np.inf, -50, 0, 50, 100, 500, np.inf],
+                                                        labels=['F', 'D', 'C', 'B', 'A', 'S'])).all())
+    check("Only the requested derived columns are added", list(evaluate(rows, ['ROI_Percent'])) == ['ROI_Percent'])
+
+    # Columnar cache
+    check("Cache written on first load", db.column_store.is_fresh())
+    cached = db.column_store.load()
+    check("Cache served on second load", cached is not None)
+    check("Cached frame matches CSV", cached is not None and cached.equals(first))
+    numeric = [col for col in first.columns if col not in categorical]
+    check("Numeric columns memory-mapped from the cache", all(is_mapped(cached[col]) for col in numeric))
+    writable = db.load_database()
+    writable.loc[0, 'Price_USD'] = 1.0
+    check("load_database returns a writable frame unless mmap is asked for",
+          writable.loc[0, 'Price_USD'] == 1.0
+          and is_mapped(VideoGameDatabase(work_dir, mmap=True).load_database()['Price_USD']))
+    check("Loading without mmap reads into memory",
+          not any(is_mapped(series) for _, series in db.column_store.load(mmap=False).items()))
+
+    os.utime(db.csv_path)
+    check("Touched but unchanged CSV keeps cache", db.column_store.load() is not None)
+
+    with open(db.csv_path, 'a') as f:
+        f.write(open(db.csv_path).read().splitlines()[-1] + '\n')
+    check("Modified CSV invalidates cache", db.column_store.load() is None)
+    check("Reload picks up new rows", len(db.load_database()) == len(csv_df) + 1)
+
+    # Incremental append
+    df = db.load_database()
+    db.load_stats(df)
+    records = generate_chunk(0, 20, np.random.SeedSequence(7)).drop(columns=['Game_ID'])
+    records['Publisher'] = records['Publisher'].astype(object)
+    records.loc[0, 'Publisher'] = 'New Publisher'
+    scans = []
+    original_fill = GroupedStats._fill
+    GroupedStats._fill = lambda self, frame: (scans.append(len(frame)), original_fill(self, frame))[1]
+    hashed = []
+    original_digest = ColumnStore.file_digest
+    ColumnStore.file_digest = classmethod(lambda cls, path, appends=(): (hashed.append(path),
+                                                                        original_digest(path, appends))[1])
+    try:
+        appended = db.append_records(records.to_dict('records'))
+    finally:
+        GroupedStats._fill = original_fill
+        ColumnStore.file_digest = original_digest
+    reloaded = read_csv(db.csv_path)
+    base = df[reloaded.columns]  # load_stats added the derived columns to df
+    check("Frames mapped before the append are unchanged", base.equals(reloaded.iloc[:len(df)].astype(base.dtypes)))
+    check("Appended rows get the next Game_IDs", appended['Game_ID'].tolist() == list(range(len(df) + 1, len(df) + 21)))
+    check("Derived columns computed for appended rows",
+          np.allclose(ensure(appended)['Revenue_Million'], appended['Copies_Sold_Million'] * appended['Price_USD']))
+    check("Cache updated in place matches the CSV",
+          db.column_store.is_fresh() and db.column_store.load().equals(reloaded))
+    stats = DatasetStats.load(db.stats_path, db.fingerprint())
+    fresh = DatasetStats(reloaded)
+    appends = db.column_store._read_meta()['source']['appends']
+    check("Appending hashes only the new bytes, chained onto the old fingerprint",
+          hashed == [] and db.fingerprint() != ColumnStore.file_digest(db.csv_path)
+          and db.fingerprint() == ColumnStore.file_digest(db.csv_path, appends))
+    os.utime(db.csv_path)
+    check("Touched CSV keeps the cache after an append", db.column_store.load() is not None)
+    check("Persisted aggregates updated without rescanning history",
+          scans == [20] and stats is not None and stats.rows == len(reloaded)
+          and np.allclose(stats.publisher.sum.sort_index(), fresh.publisher.sum.sort_index()))
+
+    db.load_stats(df)  # the frame from before the append
+    check("Statistics of an outdated frame are not saved over the current ones",
+          DatasetStats.load(db.stats_path, db.fingerprint()).rows == len(reloaded))
+    current = db.load_database()
+    stats = db.load_stats(current)
+    check("A reloaded frame gets the appended statistics",
+          stats.rows == len(reloaded) and stats.fingerprint == db.fingerprint() and stats.sample is current)
+
+    # Deterministic generator
+    generated = db.generate_database(num_games=2500, chunk_size=1000)
+    check("Generator writes requested rows", len(generated) == 2500 and generated['Game_ID'].is_unique)
+    serial_csv = open(db.csv_path, 'rb').read()
+    parallel_path = os.path.join(work_dir, 'parallel.csv')
+    generate_csv(parallel_path, 2500, chunk_size=1000, workers=2)
+    check("Output identical for any worker count", open(parallel_path, 'rb').read() == serial_csv)
+finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+print(f"\nResults: {sum(checks)}/{len(checks)} checks passed")
+sys.exit(0 if all(checks) else 1)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""Test batch and headless rendering of charts to files"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import instrumentation
+from batch import render_all
+from charts import CHARTS
+from charts import ChartGenerator
+from database import VideoGameDatabase
+from interface import InteractiveInterface
+from startup import measure_startup
+
+run_py = os.path.join(os.path.dirname(__file__), '..', 'run.py')
+data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+output_dir = tempfile.mkdtemp()
+checks = []
+
+
+def check(name, condition):
+    checks.append(bool(condition))
+    print(f"{'✓' if condition else '✗'} {name}")
+
+
+try:
+    results = render_all(data_dir, output_dir=output_dir, dpi=50, workers=2)
+    check("Every chart rendered once", [r[0] for r in results] == list(range(1, len(CHARTS) + 1)))
+    check("Every chart written to disk", all(os.path.getsize(r[1]) > 0 for r in results))
+    check("Per-chart times reported", all(r[2] > 0 for r in results))
+    check("No chart reported an error", not any(r.error for r in results))
+
+    # Rendered-chart cache
+    again = render_all(data_dir, output_dir=output_dir, dpi=50, workers=1)
+    check("Unchanged data is served from cache", all(r.cached for r in again))
+    check("Other render parameters re-render",
+          not any(r.cached for r in render_all(data_dir, charts=[1], output_dir=output_dir, dpi=40, workers=1)))
+    df = VideoGameDatabase(data_dir).load_database()
+    changed = df.head(500).copy()
+    changed.attrs = {}
+    check("Changed data re-renders",
+          not any(r.cached for r in render_all(changed, charts=[3], output_dir=output_dir, dpi=50, workers=1)))
+
+    # Background pre-rendering in the menu
+    prerender_dir = os.path.join(output_dir, 'prerender')
+    interface = InteractiveInterface(ChartGenerator(df), data_source=data_dir, prerender_workers=2,
+                                     output_dir=prerender_dir)
+    interface.start_prerender()
+    for job in interface.prerender_jobs.values():
+        job.result()
+    check("Menu pre-renders every chart in the background",
+          all(interface.chart_status(n) == 'ready' for n in range(1, 11))
+          and len(interface.prerender_jobs) == len(CHARTS))
+    interface.stop_prerender()
+    check("Pre-rendering stops cleanly", interface.executor is None)
+    from concurrent.futures import Future
+    from render import render_chart
+    foreground_dir = os.path.join(output_dir, 'foreground')
+    interface = InteractiveInterface(ChartGenerator(df), prerender_workers=0, output_dir=foreground_dir)
+    interface.prerender_jobs[1] = cancelled = Future()
+    cancelled.cancel()
+    before = interface.chart_status(1)
+    render_chart(interface.chart_generator, 1, foreground_dir)  # as display_chart does after cancelling
+    check("A cancelled pre-render shows as ready once rendered in the foreground",
+          before == 'not rendered' and interface.chart_status(1) == 'ready')
+
+    headless_dir = os.path.join(output_dir, 'headless')
+    proc = subprocess.run([sys.executable, run_py, '--headless', '--charts', '2,5-6', '--data-dir', data_dir,
+                           '--output-dir', headless_dir, '--format', 'svg', '--dpi', '50'],
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=300)
+    check("Headless run exits 0 without prompting", proc.returncode == 0)
+    check("Headless run writes only selected charts",
+          sorted(f for f in os.listdir(headless_dir) if not f.startswith('.')) == ['chart_2.svg', 'chart_5.svg', 'chart_6.svg'])
+    empty_dir = os.path.join(output_dir, 'empty')
+    os.makedirs(empty_dir)
+    proc = subprocess.run([sys.executable, run_py, '--headless', '--data-dir', os.path.join(empty_dir, 'data'),
+                           '--output-dir', os.path.join(empty_dir, 'out'), '--workers', '4', '--dpi', '30'],
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=300)
+    check("First headless run on parallel workers generates the data once and renders every chart",
+          proc.returncode == 0 and len(os.listdir(os.path.join(empty_dir, 'out'))) >= len(CHARTS))
+    stream_dir = os.path.join(output_dir, 'stream')
+    os.makedirs(os.path.join(stream_dir, 'data'))
+    shutil.copy(os.path.join(data_dir, 'video_games.csv'), os.path.join(stream_dir, 'data'))
+    proc = subprocess.run([sys.executable, run_py, '--headless', '--stream', '--data-dir', os.path.join(stream_dir, 'data'),
+                           '--output-dir', os.path.join(stream_dir, 'out'), '--workers', '2', '--dpi', '30'],
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=300)
+    check("Streamed headless run renders every chart without loading the dataset",
+          proc.returncode == 0 and len(os.listdir(os.path.join(stream_dir, 'out'))) >= len(CHARTS)
+          and os.listdir(os.path.join(stream_dir, 'data')) == ['video_games.csv'])
+    check("Streamed charts are cached apart from charts of every row",
+          all(r.cached for r in render_all(os.path.join(stream_dir, 'data'), output_dir=os.path.join(stream_dir, 'out'),
+                                           dpi=30, workers=1, stream=True))
+          and VideoGameDatabase(data_dir).stream_fingerprint() != VideoGameDatabase(data_dir).fingerprint())
+    proc = subprocess.run([sys.executable, run_py, '--headless', '--charts', '11'],
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60)
+    check("Invalid chart selection exits with usage error", proc.returncode == 2)
+
+    # Refresh mode: kept figures are updated in place with new data
+    import matplotlib.pyplot as plt
+    from matplotlib.image import imread
+    from matplotlib.text import Text
+    refreshing = ChartGenerator(df, refresh=True)
+    for n in range(1, len(CHARTS) + 1):
+        # Rendered (and laid out) once before the data changes
+        render_chart(refreshing, n, os.path.join(output_dir, 'before'), dpi=30)
+    first = refreshing.chart_1_sales_by_genre_bar()
+    scaled = df.copy()
+    scaled['Sales_Million'] = scaled['Sales_Million'] * 2
+    scaled.attrs = {}
+    before = max(bar.get_height() for bar in first.axes[0].patches)
+    refreshing.update_data(scaled)
+    check("Refresh mode reuses the figure after new data",
+          refreshing.chart_1_sales_by_genre_bar() is first
+          and abs(max(bar.get_height() for bar in first.axes[0].patches) - 2 * before) < 1e-9)
+    def limits_and_labels(fig):
+        return ([(ax.get_xlim(), ax.get_ylim()) for ax in fig.axes],
+                sorted(text.get_text() for text in fig.findobj(Text) if text.get_visible()))
+    fresh = ChartGenerator(scaled, refresh=True)
+    same = matching = True
+    for n, (_, name) in enumerate(CHARTS, 1):
+        a = imread(render_chart(refreshing, n, os.path.join(output_dir, 'refreshed'), dpi=30))
+        b = imread(render_chart(fresh, n, os.path.join(output_dir, 'fresh'), dpi=30))
+        same = same and a.shape == b.shape and (a == b).all()
+        matching = matching and limits_and_labels(refreshing._figures[name][0]) == limits_and_labels(fresh._figures[name][0])
+        fresh.close()  # one fresh figure open at a time
+    check("Refreshed charts match freshly built ones", same)
+    unscaled = ChartGenerator(df).chart_1_sales_by_genre_bar()
+    check("Refreshed figures get the axes limits and labels of fresh ones",
+          matching and first.axes[0].get_ylim() != unscaled.axes[0].get_ylim())
+    plt.close(unscaled)
+    refreshing.close()
+    check("Refresh checks leave no figure open", not plt.get_fignums())
+
+    # Labels stay bounded and non-overlapping with thousands of bars
+    import numpy as np
+    from labels import MAX_LABELS, LabelLayer, top_k
+    values = np.random.default_rng(0).random(5000)
+    check("top_k picks the highest values in order",
+          list(top_k(values, 5)) == list(np.argsort(-values)[:5]))
+    fig, ax = plt.subplots()
+    ax.bar(range(len(values)), values)
+    labels = LabelLayer(ax, ha='center', va='bottom')
+    labels.set_labels(range(len(values)), values, [f'{val:.2f}' for val in values])
+    fig.canvas.draw()
+    placed, boxes = labels._placed(fig.canvas.get_renderer())
+    check("Label layer draws at most the top labels, without overlaps",
+          len(labels.texts) == MAX_LABELS and 0 < len(placed) <= MAX_LABELS
+          and not any(a.overlaps(b) for i, a in enumerate(boxes) for b in boxes[i + 1:]))
+    plt.close(fig)
+
+    # HTTP server: chart endpoints with ETag / Last-Modified revalidation
+    import http.client
+    import json
+    import threading
+    from server import DashboardServer
+    server = DashboardServer(('127.0.0.1', 0), data_dir, os.path.join(output_dir, 'web'), workers=1, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(path, headers=None):
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=120)
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    try:
+        response, body = get('/charts/1.png?dpi=40')
+        etag, modified = response.getheader('ETag'), response.getheader('Last-Modified')
+        check("Server renders a chart as PNG with ETag and Last-Modified",
+              response.status == 200 and body.startswith(b'\x89PNG') and etag and modified)
+        check("Matching If-None-Match is answered with 304",
+              get('/charts/1.png?dpi=40', {'If-None-Match': etag})[0].status == 304)
+        check("Unchanged If-Modified-Since is answered with 304",
+              get('/charts/1.png?dpi=40', {'If-Modified-Since': modified})[0].status == 304)
+        response, body = get('/charts/6.svg?dpi=40')
+        check("Server renders SVG", response.status == 200 and response.getheader('Content-Type') == 'image/svg+xml')
+        check("Unknown charts and bad dpi are rejected",
+              get('/charts/11.png')[0].status == 404 and get('/charts/1.png?dpi=big')[0].status == 400)
+        hashed = []
+        original_fingerprint = server.db.fingerprint
+        server.db.fingerprint = lambda: (hashed.append(1), original_fingerprint())[1]
+        try:
+            revalidated = [get('/charts/1.png?dpi=40', {'If-None-Match': etag})[0].status for _ in range(3)]
+            os.utime(server.db.csv_path)
+            get('/charts/1.png?dpi=40', {'If-None-Match': etag})
+        finally:
+            server.db.fingerprint = original_fingerprint
+        check("Fingerprint is computed again only when the CSV changes",
+              revalidated == [304] * 3 and len(hashed) == 1)
+
+        # Concurrent requests for one chart share a single render
+        queue = server.queue
+        fingerprint = server.dataset_version()[0]
+        check("Served charts are stored per dataset fingerprint",
+              os.path.exists(os.path.join(queue.chart_dir(fingerprint, 40), 'chart_1.png'))
+              and queue.chart_dir(fingerprint, 40) != queue.chart_dir('other', 40))
+        renders = queue.metrics()['renders']
+        jobs = [queue.submit(3, fingerprint, 'png', 35) for _ in range(4)]
+        check("Identical in-flight requests are coalesced",
+              all(job is jobs[0] for job in jobs) and queue.metrics()['coalesced'] >= 3)
+        jobs[0].result()
+        metrics = json.loads(get('/metrics')[1])
+        check("Queue metrics report one render, depth and wait times",
+              metrics['renders'] == renders + 1 and {'in_flight', 'waiting', 'wait_p95'} <= set(metrics)
+              and metrics['wait_max'] > 0)
+
+        # A data reload cancels the old version's queued renders
+        old = [queue.submit(n, 'old-version', 'png', 30) for n in range(1, 7)]
+        new = queue.render(1, 'new-version', 'png', 30)
+        check("Reload cancels queued renders of the old data and renders into the new version's directory",
+              any(job.cancelled() for job in old) and queue.metrics()['cancelled'] >= 1
+              and new.filepath.startswith(queue.chart_dir('new-version', 30)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    streaming = DashboardServer(('127.0.0.1', 0), os.path.join(stream_dir, 'data'), os.path.join(stream_dir, 'web'),
+                                workers=1, quiet=True, stream=True)
+    try:
+        fingerprint = streaming.dataset_version()[0]
+        check("Server renders from the streamed statistics",
+              fingerprint == VideoGameDatabase(os.path.join(stream_dir, 'data')).stream_fingerprint()
+              and not streaming.queue.render(5, fingerprint, 'png', 30).error)
+    finally:
+        streaming.server_close()
+
+    # Per-stage instrumentation and cProfile dumps
+    profile_dir = os.path.join(output_dir, 'profile')
+    instrumentation.enable(profile_dir)
+    render_all(data_dir, charts=[4], output_dir=output_dir, dpi=40, workers=1, use_cache=False)
+    instrumentation.disable()
+    stages = {(r['chart'], r['stage']) for r in instrumentation.snapshot()}
+    check("Instrumentation records every render stage of the chart",
+          {(4, 'aggregate'), (4, 'build'), (4, 'layout'), (4, 'savefig')} <= stages)
+    check("cProfile dump written per chart", os.path.exists(os.path.join(profile_dir, 'chart_4.pstats')))
+
+    # Startup: plotting libraries and chart modules load on first use
+    startup = measure_startup(data_dir, os.path.join(output_dir, 'startup'))
+    check("Reaching the menu does not import matplotlib or seaborn",
+          not {'matplotlib', 'seaborn'} & set(startup['modules']))
+    check("Startup report times every import", 'pandas' in startup['import_times'] and startup['total'] > 0)
+    check("Time to menu includes loading statistics and starting pre-rendering",
+          startup['stats'] > 0 and startup['prerender'] > 0
+          and abs(startup['total'] - sum(startup[s] for s in ('imports', 'load', 'stats', 'prerender'))) < 1e-9)
+finally:
+    shutil.rmtree(output_dir, ignore_errors=True)
+
+print(f"\nResults: {sum(checks)}/{len(checks)} checks passed")
+sys.exit(0 if all(checks) else 1)